@@ -0,0 +1,189 @@
+"""sufi.py boru xətti üçün benchmark: sintetik leksikon üzərində hər mərhələnin vaxtı və yaddaşı.
+
+İstifadə:
+    python benchmark.py --sizes 1000 10000 100000 --output bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+import sufi
+
+# ==================== SİNTETİK LEKSİKON ====================
+ONSETS = ['', 'b', 'd', 'g', 'k', 'l', 'm', 'n', 'q', 'r', 's', 't', 'y', 'z', 'ç', 'ş', 'x']
+CODAS = ['', 'b', 'd', 'k', 'l', 'm', 'n', 'q', 'r', 's', 't', 'z', 'ş']
+
+def synthetic_lexicon(size, seed=0, special_rate=0.001):
+    """Bütün ahəng siniflərini (hər son sait, saitlə/samitlə bitən) və SPECIAL_WORDS-u əhatə edən söz siyahısı."""
+    rng = random.Random(seed)
+    vowels = list(sufi.VOWELS)
+    special = list(sufi.SPECIAL_WORDS)
+    words = []
+    for i in range(size):
+        if rng.random() < special_rate:
+            words.append(rng.choice(special))
+            continue
+        # Son sait və son səs növü dövri seçilir ki, bütün siniflər bərabər təmsil olunsun
+        last_vowel = vowels[i % len(vowels)]
+        vowel_final = (i // len(vowels)) % 2 == 0
+        syllables = [rng.choice(ONSETS) + rng.choice(vowels) + rng.choice(CODAS) for _ in range(rng.randint(0, 2))]
+        last = rng.choice(ONSETS[1:]) + last_vowel + ('' if vowel_final else rng.choice(CODAS[1:]))
+        words.append(''.join(syllables) + last)
+    return words
+
+# ==================== ÖLÇMƏ ====================
+def stage_result(seconds, words, rows, peak_rss_mb):
+    return {
+        'seconds': round(seconds, 4),
+        'words_per_s': round(words / seconds, 1) if seconds else None,
+        'rows_per_s': round(rows / seconds, 1) if seconds else None,
+        'peak_rss_mb': peak_rss_mb
+    }
+
+def run_stage(stages, name, words, rows, func, trace_memory=False):
+    """Mərhələni işə salır və vaxtı, sürəti, mərhələnin öz yaddaş zirvəsini stages lüğətinə yazır."""
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    with sufi.track_peak_rss(reset=True) as peak:
+        result = func()
+    seconds = time.perf_counter() - start
+    stage = stage_result(seconds, words, rows, peak['peak_rss_mb'])
+    if trace_memory:
+        stage['py_peak_mb'] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 1)
+        tracemalloc.stop()
+    stages[name] = stage
+    print(f"  {name:<32} {seconds:9.3f} s")
+    return result
+
+# sufi.excel_writer bloku içində çağırılan mərhələlər
+EXCEL_WRITE_NESTED = ('width_pass', 'styling')
+
+def run_pipeline(stages, name, words, rows, func, trace_memory=False):
+    """İnstrumentasiyalı işi (process_words və s.) ölçür və onun öz mərhələlərini də ayrıca yazır.
+
+    Mərhələlər kitabxananın pipeline_run hesabatından götürülür, yəni benchmark işin həqiqətən icra etdiyi
+    kodu ölçür. excel_write içində ölçülən mərhələlər (EXCEL_WRITE_NESTED) excel_write-dan çıxılır.
+    """
+    reports = []
+    def on_event(event):
+        if event['event'] == 'run':
+            reports.append(event)
+    sufi.add_instrumentation_hook(on_event)
+    try:
+        result = run_stage(stages, name, words, rows, func, trace_memory)
+    finally:
+        sufi.remove_instrumentation_hook(on_event)
+    inner = reports[-1]['stages']
+    for stage_name, entry in inner.items():
+        seconds = entry['seconds']
+        if stage_name == 'excel_write':
+            seconds -= sum(inner.get(nested, {}).get('seconds', 0.0) for nested in EXCEL_WRITE_NESTED)
+        stages[f"{name}.{stage_name}"] = stage_result(seconds, words, rows, entry['peak_rss_mb'])
+        print(f"    {stage_name:<30} {seconds:9.3f} s")
+    return result
+
+def bench_size(size, workdir, seed=0, trace_memory=False, legacy=True):
+    """Bir ölçü üçün bütün mərhələləri ölçür."""
+    words = pd.Series(synthetic_lexicon(size, seed))
+    input_file = os.path.join(workdir, f'input_{size}.xlsx')
+    output_file = os.path.join(workdir, f'output_{size}.xlsx')
+    words.to_frame('Söz').to_excel(input_file, index=False)
+    rows = size * len(sufi.PARADIGM_SLOTS)
+    stages = {}
+    print(f"▶ {size} söz")
+
+    # process_words: read_input, generation, excel_write, width_pass, excel_save (kitabxananın öz mərhələləri)
+    run_pipeline(stages, 'process_words', size, rows,
+                 lambda: sufi.process_words(input_file, output_file, route_pos=False), trace_memory)
+
+    if legacy:
+        run_stage(stages, 'extract_unique_suffixes', size, rows,
+                  lambda: sufi.extract_unique_suffixes_and_examples_with_code_suffixes(output_file, output_file),
+                  trace_memory)
+        run_stage(stages, 'create_isimler_sheet', size, size,
+                  lambda: sufi.create_isimler_sheet_with_grouped_headers(output_file), trace_memory)
+
+    run_pipeline(stages, 'build_workbook', size, rows,
+                 lambda: sufi.build_workbook(words, os.path.join(workdir, f'workbook_{size}.xlsx'), route_pos=False),
+                 trace_memory)
+    return {'size': size, 'rows': rows, 'stages': stages}
+
+# ==================== BAŞLANĞIC YOXLAMASI ====================
+# Morfologiya nüvəsi bu modullarsız idxal olunmalıdır (sufi.py-də gecikməli idxal)
+HEAVY_MODULES = ('numpy', 'pandas', 'openpyxl')
+
+def startup_check(repeat=5):
+    """Təmiz prosesdə `import sufi` vaxtını (ən yaxşı nəticə) və yüklənmiş ağır modulları ölçür."""
+    code = ("import sys, time; start = time.perf_counter(); import sufi; "
+            "print(time.perf_counter() - start); "
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    times, loaded = [], set()
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__))).stdout.splitlines()
+        times.append(float(out[0]))
+        loaded.update(m for m in out[1].split(',') if m)
+    return {'import_ms': round(min(times) * 1000, 1), 'heavy_modules': sorted(loaded)}
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+# ==================== ƏSAS BLOK ====================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="sufi.py boru xətti üçün benchmark")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000],
+                        help="leksikon ölçüləri (1000 ... 1000000)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='bench.json', help="nəticələrin yazılacağı JSON faylı")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="hər mərhələ üçün tracemalloc ilə Python yaddaş zirvəsini də ölç (yavaşdır); "
+                             "RSS zirvəsini sıfırlamaq mümkün olmayan sistemlərdə avtomatik qoşulur")
+    parser.add_argument('--skip-legacy', action='store_true',
+                        help="fayldan oxuyan köhnə mərhələləri (şəkilçi çıxarma, İsimlər) ölçmə")
+    parser.add_argument('--check-startup', action='store_true',
+                        help="yalnız `import sufi` yoxlaması: ağır modul yüklənərsə və ya limit aşılarsa xəta kodu ilə çıx")
+    parser.add_argument('--max-import-ms', type=float, default=200.0,
+                        help="--check-startup üçün `import sufi` vaxtının yuxarı həddi (ms)")
+    args = parser.parse_args()
+
+    startup = startup_check()
+    print(f"▶ import sufi: {startup['import_ms']} ms, ağır modullar: {startup['heavy_modules'] or 'yoxdur'}")
+    if args.check_startup:
+        if startup['heavy_modules'] or startup['import_ms'] > args.max_import_ms:
+            print("❌ Başlanğıc yoxlaması uğursuz oldu")
+            sys.exit(1)
+        print("✅ Başlanğıc yoxlaması keçdi")
+        sys.exit(0)
+
+    # Mərhələ zirvələri üçün RSS zirvəsi sıfırlanmalıdır (Linux); olmazsa tracemalloc-a keçilir
+    trace_memory = args.trace_memory or not sufi.reset_peak_rss()
+    report = {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'startup': startup,
+        'results': []
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in args.sizes:
+            report['results'].append(
+                bench_size(size, workdir, args.seed, trace_memory, legacy=not args.skip_legacy)
+            )
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"✅ Nəticələr '{args.output}' faylına yazıldı")
@@ -0,0 +1,148 @@
+"""sufi.py paradiqma servisi üçün yük testi: paralel müştərilər, gecikmə, ötürmə qabiliyyəti və servis metrikləri.
+
+İstifadə:
+    python sufi.py --serve --port 8765 &
+    python loadtest.py --port 8765 --clients 32 --requests 200 --words 5
+
+    # servisi test özü işə salsın:
+    python loadtest.py --spawn --clients 32 --requests 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+from benchmark import git_commit, synthetic_lexicon
+
+# ==================== HTTP MÜŞTƏRİSİ ====================
+async def open_connection(args):
+    if args.unix_socket:
+        return await asyncio.open_unix_connection(args.unix_socket)
+    return await asyncio.open_connection(args.host, args.port)
+
+async def http_request(reader, writer, method, path, payload=None):
+    """Keep-alive bağlantısı üzərindən bir sorğu göndərir, (status, JSON) qaytarır."""
+    body = json.dumps(payload, ensure_ascii=False).encode('utf-8') if payload is not None else b''
+    writer.write((
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+    ).encode('latin-1') + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.strip().lower() == 'content-length':
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+async def fetch(args, path):
+    reader, writer = await open_connection(args)
+    try:
+        return await http_request(reader, writer, 'GET', path)
+    finally:
+        writer.close()
+
+# ==================== YÜK ====================
+async def client(args, lexicon, seed, latencies, failures):
+    """Bir müştəri: bir bağlantı üzərindən ardıcıl --requests sorğu göndərir."""
+    rng = random.Random(seed)
+    reader, writer = await open_connection(args)
+    try:
+        for _ in range(args.requests):
+            words = rng.sample(lexicon, args.words)
+            start = time.perf_counter()
+            status, response = await http_request(reader, writer, 'POST', '/paradigm', {'words': words})
+            latencies.append((time.perf_counter() - start) * 1000)
+            if status != 200 or len(response['paradigms']) != len(words):
+                failures.append(status)
+    finally:
+        writer.close()
+
+async def wait_until_ready(args, timeout=30):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            status, _ = await fetch(args, '/health')
+            if status == 200:
+                return
+        except OSError:
+            pass
+        if time.monotonic() > deadline:
+            raise RuntimeError("Servis vaxtında hazır olmadı")
+        await asyncio.sleep(0.1)
+
+def percentile(values, q):
+    return round(values[min(len(values) - 1, int(q * len(values)))], 3) if values else None
+
+async def run(args):
+    await wait_until_ready(args)
+    lexicon = synthetic_lexicon(args.lexicon_size, args.seed)
+    latencies, failures = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        client(args, lexicon, args.seed + i, latencies, failures) for i in range(args.clients)
+    ))
+    seconds = time.perf_counter() - start
+    _, metrics = await fetch(args, '/metrics')
+
+    latencies.sort()
+    requests = len(latencies)
+    return {
+        'clients': args.clients, 'requests': requests, 'words_per_request': args.words,
+        'failures': len(failures), 'seconds': round(seconds, 3),
+        'requests_per_s': round(requests / seconds, 1) if seconds else None,
+        'words_per_s': round(requests * args.words / seconds, 1) if seconds else None,
+        'latency_ms': {
+            'p50': percentile(latencies, 0.50), 'p95': percentile(latencies, 0.95),
+            'p99': percentile(latencies, 0.99), 'max': percentile(latencies, 1.0)
+        },
+        'server': metrics
+    }
+
+# ==================== ƏSAS BLOK ====================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="sufi.py paradiqma servisi üçün yük testi")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix-socket', help="TCP əvəzinə Unix soketinə qoşul")
+    parser.add_argument('--clients', type=int, default=32, help="eyni vaxtda işləyən müştərilər")
+    parser.add_argument('--requests', type=int, default=200, help="hər müştərinin sorğu sayı")
+    parser.add_argument('--words', type=int, default=5, help="hər sorğudakı söz sayı")
+    parser.add_argument('--lexicon-size', type=int, default=10000, help="sözlərin seçildiyi sintetik leksikon")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--spawn', action='store_true', help="servisi ayrıca prosesdə özü işə sal və sonda dayandır")
+    parser.add_argument('--output', help="nəticələrin yazılacağı JSON faylı")
+    args = parser.parse_args()
+
+    server = None
+    if args.spawn:
+        command = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sufi.py'), '--serve']
+        command += ['--unix-socket', args.unix_socket] if args.unix_socket else ['--host', args.host, '--port', str(args.port)]
+        server = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+    try:
+        result = asyncio.run(run(args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    latency = result['latency_ms']
+    print(f"▶ {result['requests']} sorğu ({result['clients']} müştəri), {result['seconds']} s: "
+          f"{result['requests_per_s']} sorğu/s, {result['words_per_s']} söz/s")
+    print(f"  gecikmə (ms): p50={latency['p50']} p95={latency['p95']} p99={latency['p99']} max={latency['max']}")
+    print(f"  servis: {result['server']['batches']} batch, orta {result['server']['avg_batch_requests']} sorğu/batch, "
+          f"maks. növbə {result['server']['queue_depth_max']}, xəta {result['failures']}")
+    if args.output:
+        result.update({'commit': git_commit(), 'python': platform.python_version(), 'platform': platform.platform()})
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"✅ Nəticələr '{args.output}' faylına yazıldı")
@@ -1,7 +1,60 @@
-import pandas as pd
-from openpyxl.utils import get_column_letter
-from openpyxl import load_workbook
-from openpyxl.styles import Alignment, Font, PatternFill
+import argparse
+import csv
+import functools
+import hashlib
+import importlib
+import io
+import itertools
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+import unicodedata
+from collections import deque, namedtuple
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# ==================== GECİKMƏLİ İDXAL ====================
+# Morfologiya nüvəsi (sabitlər, get_last_vowel, detect_pos, generate_*) pandas/numpy/openpyxl-siz işləyir;
+# bu kitabxanalar yalnız cədvəl/Excel funksiyaları ilk dəfə çağırılanda yüklənir.
+class _LazyModule:
+    """Modulu ilk atribut müraciətində idxal edir."""
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+def _lazy_callable(module, name):
+    """module.name funksiyasını/sinfini ilk çağırışda idxal edən əvəzedici."""
+    lazy = _LazyModule(module)
+    def call(*args, **kwargs):
+        return getattr(lazy, name)(*args, **kwargs)
+    call.__name__ = name
+    return call
+
+np = _LazyModule('numpy')
+pd = _LazyModule('pandas')
+get_column_letter = _lazy_callable('openpyxl.utils', 'get_column_letter')
+Workbook = _lazy_callable('openpyxl', 'Workbook')
+load_workbook = _lazy_callable('openpyxl', 'load_workbook')
+Alignment = _lazy_callable('openpyxl.styles', 'Alignment')
+Font = _lazy_callable('openpyxl.styles', 'Font')
+PatternFill = _lazy_callable('openpyxl.styles', 'PatternFill')
+# Yalnız çoxprosesli rejim, profil və servis üçün lazım olan standart modullar
+cProfile = _LazyModule('cProfile')
+pstats = _LazyModule('pstats')
+asyncio = _LazyModule('asyncio')
+ProcessPoolExecutor = _lazy_callable('concurrent.futures', 'ProcessPoolExecutor')
 
 # ==================== KONSTANTLAR ====================
 VOWELS = 'aıouəeiöü'
@@ -19,6 +72,72 @@ SPECIAL_WORDS = {
     'ana': {'possessive': {'1s': 'anam'}}
 }
 
+CASES = ['Adlıq', 'Yiyəlik', 'Yönlük', 'Təsirlik', 'Yerlik', 'Çıxışlıq']
+PERSONS = ['1s', '2s', '3s', '1p', '2p', '3p']
+PERSON_NAMES = ['mən', 'sən', 'o', 'biz', 'siz', 'onlar']
+XEBERLIK_PERSON_NAMES = dict(zip(PERSONS, PERSON_NAMES))
+
+# Excel sheet-inin sətir limiti (başlıq sətri daxil)
+EXCEL_MAX_ROWS = 1048576
+
+# Hal şəkilçiləri: son saitə görə (sonu samitlə / saitlə bitən sözlər)
+CASE_SUFFIXES_CONSONANT = {
+    'a': {'Yiyəlik': 'ın', 'Yönlük': 'a', 'Təsirlik': 'ı', 'Yerlik': 'da', 'Çıxışlıq': 'dan'},
+    'ı': {'Yiyəlik': 'ın', 'Yönlük': 'a', 'Təsirlik': 'ı', 'Yerlik': 'da', 'Çıxışlıq': 'dan'},
+    'ə': {'Yiyəlik': 'in', 'Yönlük': 'ə', 'Təsirlik': 'i', 'Yerlik': 'də', 'Çıxışlıq': 'dən'},
+    'i': {'Yiyəlik': 'in', 'Yönlük': 'ə', 'Təsirlik': 'i', 'Yerlik': 'də', 'Çıxışlıq': 'dən'},
+    'o': {'Yiyəlik': 'un', 'Yönlük': 'a', 'Təsirlik': 'u', 'Yerlik': 'da', 'Çıxışlıq': 'dan'},
+    'u': {'Yiyəlik': 'un', 'Yönlük': 'a', 'Təsirlik': 'u', 'Yerlik': 'da', 'Çıxışlıq': 'dan'},
+    'ö': {'Yiyəlik': 'ün', 'Yönlük': 'ə', 'Təsirlik': 'ü', 'Yerlik': 'də', 'Çıxışlıq': 'dən'},
+    'ü': {'Yiyəlik': 'ün', 'Yönlük': 'ə', 'Təsirlik': 'ü', 'Yerlik': 'də', 'Çıxışlıq': 'dən'}
+}
+CASE_SUFFIXES_VOWEL = {
+    'a': {'Yiyəlik': 'nın', 'Yönlük': 'ya', 'Təsirlik': 'nı', 'Yerlik': 'da', 'Çıxışlıq': 'dan'},
+    'ı': {'Yiyəlik': 'nın', 'Yönlük': 'ya', 'Təsirlik': 'nı', 'Yerlik': 'da', 'Çıxışlıq': 'dan'},
+    'ə': {'Yiyəlik': 'nin', 'Yönlük': 'yə', 'Təsirlik': 'ni', 'Yerlik': 'də', 'Çıxışlıq': 'dən'},
+    'i': {'Yiyəlik': 'nin', 'Yönlük': 'yə', 'Təsirlik': 'ni', 'Yerlik': 'də', 'Çıxışlıq': 'dən'},
+    'o': {'Yiyəlik': 'nun', 'Yönlük': 'ya', 'Təsirlik': 'nu', 'Yerlik': 'da', 'Çıxışlıq': 'dan'},
+    'u': {'Yiyəlik': 'nun', 'Yönlük': 'ya', 'Təsirlik': 'nu', 'Yerlik': 'da', 'Çıxışlıq': 'dan'},
+    'ö': {'Yiyəlik': 'nün', 'Yönlük': 'yə', 'Təsirlik': 'nü', 'Yerlik': 'də', 'Çıxışlıq': 'dən'},
+    'ü': {'Yiyəlik': 'nün', 'Yönlük': 'yə', 'Təsirlik': 'nü', 'Yerlik': 'də', 'Çıxışlıq': 'dən'}
+}
+
+# Mənsubiyyət şəkilçiləri: şəxsə və son saitə görə
+POSSESSIVE_SUFFIXES_VOWEL = {
+    "1s": {"a": "m", "ı": "m", "ə": "m", "i": "m", "o": "m", "u": "m", "ö": "m", "ü": "m"},
+    "2s": {"a": "n", "ı": "n", "ə": "n", "i": "n", "o": "n", "u": "n", "ö": "n", "ü": "n"},
+    "3s": {"a": "sı", "ı": "sı", "ə": "si", "i": "si", "o": "su", "u": "su", "ö": "sü", "ü": "sü"},
+    "1p": {"a": "mız", "ı": "mız", "ə": "miz", "i": "miz", "o": "muz", "u": "muz", "ö": "müz", "ü": "müz"},
+    "2p": {"a": "nız", "ı": "nız", "ə": "niz", "i": "niz", "o": "nuz", "u": "nuz", "ö": "nüz", "ü": "nüz"},
+    "3p": {"a": "ları", "ı": "ları", "ə": "ləri", "i": "ləri", "o": "ları", "u": "ları", "ö": "ləri", "ü": "ləri"}
+}
+POSSESSIVE_SUFFIXES_CONSONANT = {
+    "1s": {"a": "ım", "ı": "ım", "ə": "im", "i": "im", "o": "um", "u": "um", "ö": "üm", "ü": "üm"},
+    "2s": {"a": "ın", "ı": "ın", "ə": "in", "i": "in", "o": "un", "u": "un", "ö": "ün", "ü": "ün"},
+    "3s": {"a": "ı", "ı": "ı", "ə": "i", "i": "i", "o": "u", "u": "u", "ö": "ü", "ü": "ü"},
+    "1p": {"a": "ımız", "ı": "ımız", "ə": "imiz", "i": "imiz", "o": "umuz", "u": "umuz", "ö": "ümüz", "ü": "ümüz"},
+    "2p": {"a": "ınız", "ı": "ınız", "ə": "iniz", "i": "iniz", "o": "unuz", "u": "unuz", "ö": "ünüz", "ü": "ünüz"},
+    "3p": {"a": "ları", "ı": "ları", "ə": "ləri", "i": "ləri", "o": "ları", "u": "ları", "ö": "ləri", "ü": "ləri"}
+}
+
+# Xəbərlik şəkilçiləri: şəxsə və son saitə görə
+XEBERLIK_SUFFIXES_VOWEL = {
+    "1s": {"a": "yam", "ı": "yam", "ə": "yəm", "i": "yəm", "o": "yam", "u": "yam", "ö": "yəm", "ü": "yəm"},
+    "2s": {"a": "san", "ı": "san", "ə": "sən", "i": "sən", "o": "san", "u": "san", "ö": "sən", "ü": "sən"},
+    "3s": {"a": "dır", "ı": "dır", "ə": "dir", "i": "dir", "o": "dur", "u": "dur", "ö": "dür", "ü": "dür"},
+    "1p": {"a": "yıq", "ı": "yıq", "ə": "yik", "i": "yik", "o": "yuq", "u": "yuq", "ö": "yük", "ü": "yük"},
+    "2p": {"a": "sınız", "ı": "sınız", "ə": "siniz", "i": "siniz", "o": "sunuz", "u": "sunuz", "ö": "sünüz", "ü": "sünüz"},
+    "3p": {"a": "dırlar", "ı": "dırlar", "ə": "dirlər", "i": "dirlər", "o": "durlar", "u": "durlar", "ö": "dürlər", "ü": "dürlər"}
+}
+XEBERLIK_SUFFIXES_CONSONANT = {
+    "1s": {"a": "am", "ı": "am", "ə": "əm", "i": "əm", "o": "am", "u": "am", "ö": "əm", "ü": "əm"},
+    "2s": {"a": "san", "ı": "san", "ə": "sən", "i": "sən", "o": "san", "u": "san", "ö": "sən", "ü": "sən"},
+    "3s": {"a": "dır", "ı": "dır", "ə": "dir", "i": "dir", "o": "dur", "u": "dur", "ö": "dür", "ü": "dür"},
+    "1p": {"a": "ıq", "ı": "ıq", "ə": "ik", "i": "ik", "o": "uq", "u": "uq", "ö": "ük", "ü": "ük"},
+    "2p": {"a": "sınız", "ı": "sınız", "ə": "siniz", "i": "siniz", "o": "sunuz", "u": "sunuz", "ö": "sünüz", "ü": "sünüz"},
+    "3p": {"a": "dırlar", "ı": "dırlar", "ə": "dirlər", "i": "dirlər", "o": "durlar", "u": "durlar", "ö": "dürlər", "ü": "dürlər"}
+}
+
 # ==================== KÖMƏKÇİ FUNKSİYALAR ====================
 def get_last_vowel(word):
     for ch in reversed(word):
@@ -26,233 +145,1101 @@ def get_last_vowel(word):
             return ch
     return None
 
+# Nitq hissəsi qaydaları import zamanı bir dəfə qurulur; yoxlama sırası bu siyahıların sırasıdır
+POS_WORD_SETS = (
+    ("Əvəzlik", frozenset({"mən", "sən", "o", "biz", "siz", "onlar"})),
+    ("Say", frozenset({"bir", "iki", "üç", "dörd", "beş", "altı", "yeddi", "səkkiz", "doqquz", "on"})),
+    ("Hərf", frozenset({"də", "belə", "yalnız"})),
+    ("Qoşma", frozenset({"və", "ya", "amma", "çünki"})),
+    ("Ədat", frozenset({"ilə", "üçün", "qarşı", "üstə"})),
+    ("Səslər", frozenset({"əə", "ay", "vau"}))
+)
+POS_ENDINGS = (
+    ("Fel", ("maq", "mək")),
+    ("Zərf", ("ca", "cə", "la", "lə")),
+    ("Sifət", ("lı", "li", "lu", "lü"))
+)
+DEFAULT_POS = "İsim"
+
 def detect_pos(word):
-    parts_of_speech = {
-        "pronouns": {"mən", "sən", "o", "biz", "siz", "onlar"},
-        "numerals": {"bir", "iki", "üç", "dörd", "beş", "altı", "yeddi", "səkkiz", "doqquz", "on"},
-        "particles": {"də", "belə", "yalnız"},
-        "conjunctions": {"və", "ya", "amma", "çünki"},
-        "prepositions": {"ilə", "üçün", "qarşı", "üstə"},
-        "interjections": {"əə", "ay", "vau"}
+    for pos, words in POS_WORD_SETS:
+        if word in words:
+            return pos
+    for pos, endings in POS_ENDINGS:
+        if word.endswith(endings):
+            return pos
+    return DEFAULT_POS
+
+# ==================== PARADİQMA MÜHƏRRİKİ ====================
+# Slot (kateqoriya, açar) cütüdür; sıra Bütün_Sözlər sheet-indəki sıra ilə eynidir.
+PARADIGM_SLOTS = (
+    [('Cəm', 'Cəm forması')]
+    + [('Hal', case) for case in CASES]
+    + [('Mənsubiyyət', f"{p}_{n}") for p in PERSONS for n in ('tək', 'cəm')]
+    + [('Xəbərlik', name) for name in PERSON_NAMES]
+)
+SLOT_INDEX = {slot: i for i, slot in enumerate(PARADIGM_SLOTS)}
+# Cəm mənsubiyyət formaları sözün özünə yox, cəm formasına artırılır
+PLURAL_BASED_SLOTS = frozenset(s for s in PARADIGM_SLOTS if s[0] == 'Mənsubiyyət' and s[1].endswith('_cəm'))
+
+def _compile_suffix_row(last_v, vowel_final):
+    """Bir fonoloji sinif üçün bütün slotların şəkilçilərini slot sırası ilə qaytarır."""
+    if not last_v:
+        return ('',) * len(PARADIGM_SLOTS)
+    case_map = CASE_SUFFIXES_VOWEL if vowel_final else CASE_SUFFIXES_CONSONANT
+    poss_map = POSSESSIVE_SUFFIXES_VOWEL if vowel_final else POSSESSIVE_SUFFIXES_CONSONANT
+    xeb_map = XEBERLIK_SUFFIXES_VOWEL if vowel_final else XEBERLIK_SUFFIXES_CONSONANT
+    row = []
+    for category, key in PARADIGM_SLOTS:
+        if category == 'Cəm':
+            row.append('lar' if last_v in BACK_VOWELS else 'lər')
+        elif category == 'Hal':
+            row.append(case_map.get(last_v, {}).get(key, ''))
+        elif category == 'Mənsubiyyət':
+            row.append(poss_map[key.split('_')[0]].get(last_v, ''))
+        else:
+            row.append(xeb_map[PERSONS[PERSON_NAMES.index(key)]].get(last_v, ''))
+    return tuple(row)
+
+def _compile_special_forms():
+    """SPECIAL_WORDS-u slot -> hazır forma lüğətinə çevirir."""
+    special = {}
+    for word, spec in SPECIAL_WORDS.items():
+        forms = {('Cəm', 'Cəm forması'): spec.get('plural', word + 'lar')}
+        for case, form in spec.get('case', {}).items():
+            forms[('Hal', case)] = form
+        for person, form in spec.get('possessive', {}).items():
+            forms[('Mənsubiyyət', f"{person}_tək")] = form
+            forms[('Mənsubiyyət', f"{person}_cəm")] = form
+        special[word] = forms
+    return special
+
+def _split_irregular(word, base, form):
+    """Qeyri-müntəzəm formanı (kök, şəkilçi) cütünə ayırır: əvvəl əsasla, sonra sözün özü ilə yoxlanır."""
+    for stem in (base, word):
+        if form.startswith(stem):
+            return stem, form[len(stem):]
+    return form, ''
+
+def _compile_special_splits():
+    """SPECIAL_FORMS-dakı hər formanı bir dəfəlik (kök, şəkilçi) cütünə ayırır."""
+    splits = {}
+    for word, forms in SPECIAL_FORMS.items():
+        plural = forms[PARADIGM_SLOTS[0]]
+        splits[word] = {
+            slot: _split_irregular(word, plural if slot in PLURAL_BASED_SLOTS else word, form)
+            for slot, form in forms.items()
+        }
+    return splits
+
+# Cədvəllər import zamanı bir dəfə qurulur: (son sait, sonu saitlə bitir) -> şəkilçilər
+PARADIGM_TABLES = {
+    (v, vowel_final): _compile_suffix_row(v, vowel_final)
+    for v in list(VOWELS) + [None]
+    for vowel_final in (True, False)
+}
+SPECIAL_FORMS = _compile_special_forms()
+SPECIAL_SPLITS = _compile_special_splits()
+
+class FormRecord(namedtuple('FormRecord', ['stem', 'suffix', 'category', 'slot'])):
+    """Bir forma: kök (söz və ya cəm forması), şəkilçi, kateqoriya və slot."""
+    __slots__ = ()
+
+    @property
+    def form(self):
+        return self.stem + self.suffix
+
+def classify_word(word):
+    """Sözün fonoloji sinfini qaytarır: (son sait, sonu saitlə bitirmi)."""
+    return get_last_vowel(word), bool(word) and word[-1] in VOWELS
+
+def paradigm(word):
+    """Sözün bütün formalarını bir cədvəl axtarışı ilə qaytarır: {slot: forma}."""
+    suffixes = PARADIGM_TABLES[classify_word(word)]
+    overrides = SPECIAL_FORMS.get(word)
+    plural = word + suffixes[0]
+    if overrides:
+        plural = overrides[PARADIGM_SLOTS[0]]
+    forms = {
+        slot: (plural if slot in PLURAL_BASED_SLOTS else word) + suffix
+        for slot, suffix in zip(PARADIGM_SLOTS, suffixes)
     }
-    if word in parts_of_speech["pronouns"]: return "Əvəzlik"
-    if word in parts_of_speech["numerals"]: return "Say"
-    if word in parts_of_speech["particles"]: return "Hərf"
-    if word in parts_of_speech["conjunctions"]: return "Qoşma"
-    if word in parts_of_speech["prepositions"]: return "Ədat"
-    if word in parts_of_speech["interjections"]: return "Səslər"
-    if word.endswith(("maq", "mək")): return "Fel"
-    if word.endswith(("ca", "cə", "la", "lə")): return "Zərf"
-    if word.endswith(("lı", "li", "lu", "lü")): return "Sifət"
-    return "İsim"
+    forms[PARADIGM_SLOTS[0]] = plural
+    if overrides:
+        forms.update(overrides)
+    return forms
+
+def paradigm_records(word):
+    """Sözün bütün formalarını slot sırası ilə FormRecord kimi qaytarır."""
+    suffixes = PARADIGM_TABLES[classify_word(word)]
+    overrides = SPECIAL_SPLITS.get(word)
+    records = []
+    plural = word
+    for slot, suffix in zip(PARADIGM_SLOTS, suffixes):
+        stem = plural if slot in PLURAL_BASED_SLOTS else word
+        if overrides and slot in overrides:
+            stem, suffix = overrides[slot]
+        records.append(FormRecord(stem, suffix, slot[0], slot[1]))
+        if slot == PARADIGM_SLOTS[0]:
+            plural = stem + suffix
+    return records
+
+def inflect(word, slot):
+    """Sözün tək bir slotdakı formasını qaytarır."""
+    overrides = SPECIAL_FORMS.get(word)
+    if overrides and slot in overrides:
+        return overrides[slot]
+    i = SLOT_INDEX.get(slot)
+    suffix = PARADIGM_TABLES[classify_word(word)][i] if i is not None else ''
+    plural_based = slot[0] == 'Mənsubiyyət' and slot[1].endswith('_cəm')
+    base = inflect(word, PARADIGM_SLOTS[0]) if plural_based else word
+    return base + suffix
+
+# Vektorlaşdırılmış yol üçün: sinif nömrəsi -> şəkilçi massivi (hər slot üçün bir massiv)
+CLASS_KEYS = list(PARADIGM_TABLES)
+
+@functools.lru_cache(maxsize=None)
+def slot_suffix_arrays():
+    """Hər slot üçün sinif id-sinə görə şəkilçi massivi (numpy ilk vektorlaşdırılmış çağırışda yüklənir)."""
+    return [
+        np.array([PARADIGM_TABLES[cls][i] for cls in CLASS_KEYS], dtype=object)
+        for i in range(len(PARADIGM_SLOTS))
+    ]
+
+_VOWEL_IDS = {v: i for i, v in enumerate(VOWELS)}
+_LAST_VOWEL_PATTERN = f"([{VOWELS}])[^{VOWELS}]*$"
+
+def classify_words(words):
+    """Söz sütununu vektorlaşdırılmış sətir əməliyyatları ilə sinif nömrələrinə (CLASS_KEYS indeksi) ayırır."""
+    last_v = words.str.extract(_LAST_VOWEL_PATTERN, expand=False)
+    vowel_ids = last_v.map(_VOWEL_IDS).fillna(len(VOWELS)).to_numpy(dtype=int)
+    consonant_final = ~words.str[-1:].isin(list(VOWELS)).to_numpy()
+    # CLASS_KEYS sırası: hər sait üçün əvvəl (sait, True), sonra (sait, False)
+    return vowel_ids * 2 + consonant_final
+
+def _word_series(words):
+    """Sözləri str Series-ə çevirir; boş (None/NaN) dəyərlər iter_input_words-dakı kimi 'nan' olur."""
+    s = pd.Series(words, dtype=object)
+    return s.where(s.notna(), 'nan').astype(str)
+
+def paradigm_arrays(words):
+    """Vektorlaşdırılmış nüvə: sözləri və hər slot üçün (kök massivi, şəkilçi massivi) cütünü qaytarır."""
+    words = _word_series(words)
+    classes = classify_words(words)
+    stems = words.to_numpy(dtype=object)
+    special = [(i, SPECIAL_SPLITS[w]) for i, w in enumerate(stems) if w in SPECIAL_SPLITS] \
+        if words.isin(SPECIAL_SPLITS.keys()).any() else []
+
+    columns = []
+    plural = stems
+    slot_arrays = slot_suffix_arrays()
+    for i, slot in enumerate(PARADIGM_SLOTS):
+        base = plural if slot in PLURAL_BASED_SLOTS else stems
+        suffixes = slot_arrays[i][classes]
+        if special:
+            base = base.copy()
+            for j, overrides in special:
+                if slot in overrides:
+                    base[j], suffixes[j] = overrides[slot]
+        columns.append((base, suffixes))
+        if i == 0:
+            plural = base + suffixes
+    return words, columns
+
+def generate_paradigms(words):
+    """Söz sütunu üçün bütün formaları sinif üzrə vektorlaşdırılmış birləşmə ilə qurur.
+
+    Nəticə 'Söz' və hər slot üçün bir sütundan ibarət DataFrame-dir
+    (sütun adları İsimlər sheet-inin alt başlıqlarıdır).
+    """
+    words, columns = paradigm_arrays(words)
+    table = {'Söz': words.to_numpy(dtype=object)}
+    for slot, (stems, suffixes) in zip(PARADIGM_SLOTS, columns):
+        table[slot[1]] = stems + suffixes
+    return pd.DataFrame(table, index=words.index)
 
 def generate_plural(word):
-    if word in SPECIAL_WORDS:
-        return SPECIAL_WORDS[word].get('plural', word+'lar')
-    last_v = get_last_vowel(word)
-    if not last_v:
-        return word
-    if last_v in BACK_VOWELS:
-        return f"{word}lar"
-    return f"{word}lər"
+    return inflect(word, ('Cəm', 'Cəm forması'))
 
 def generate_case(word, case):
-    if word in SPECIAL_WORDS and case in SPECIAL_WORDS[word].get('case', {}):
-        return SPECIAL_WORDS[word]['case'][case]
-    last_v = get_last_vowel(word)
-    if not last_v:
-        return word
-    # Sonu samitlə bitənlər
-    if word[-1] not in VOWELS:
-        case_map = {
-            'a': {'Yiyəlik': 'ın', 'Yönlük': 'a', 'Təsirlik': 'ı', 'Yerlik': 'da', 'Çıxışlıq': 'dan'},
-            'ı': {'Yiyəlik': 'ın', 'Yönlük': 'a', 'Təsirlik': 'ı', 'Yerlik': 'da', 'Çıxışlıq': 'dan'},
-            'ə': {'Yiyəlik': 'in', 'Yönlük': 'ə', 'Təsirlik': 'i', 'Yerlik': 'də', 'Çıxışlıq': 'dən'},
-            'i': {'Yiyəlik': 'in', 'Yönlük': 'ə', 'Təsirlik': 'i', 'Yerlik': 'də', 'Çıxışlıq': 'dən'},
-            'o': {'Yiyəlik': 'un', 'Yönlük': 'a', 'Təsirlik': 'u', 'Yerlik': 'da', 'Çıxışlıq': 'dan'},
-            'u': {'Yiyəlik': 'un', 'Yönlük': 'a', 'Təsirlik': 'u', 'Yerlik': 'da', 'Çıxışlıq': 'dan'},
-            'ö': {'Yiyəlik': 'ün', 'Yönlük': 'ə', 'Təsirlik': 'ü', 'Yerlik': 'də', 'Çıxışlıq': 'dən'},
-            'ü': {'Yiyəlik': 'ün', 'Yönlük': 'ə', 'Təsirlik': 'ü', 'Yerlik': 'də', 'Çıxışlıq': 'dən'}
-        }
-        suffix = case_map.get(last_v, {}).get(case, '')
-        return f"{word}{suffix}"
-    # Sonu saitlə bitənlər
-    else:
-        case_map = {
-            'a': {'Yiyəlik': 'nın', 'Yönlük': 'ya', 'Təsirlik': 'nı', 'Yerlik': 'da', 'Çıxışlıq': 'dan'},
-            'ı': {'Yiyəlik': 'nın', 'Yönlük': 'ya', 'Təsirlik': 'nı', 'Yerlik': 'da', 'Çıxışlıq': 'dan'},
-            'ə': {'Yiyəlik': 'nin', 'Yönlük': 'yə', 'Təsirlik': 'ni', 'Yerlik': 'də', 'Çıxışlıq': 'dən'},
-            'i': {'Yiyəlik': 'nin', 'Yönlük': 'yə', 'Təsirlik': 'ni', 'Yerlik': 'də', 'Çıxışlıq': 'dən'},
-            'o': {'Yiyəlik': 'nun', 'Yönlük': 'ya', 'Təsirlik': 'nu', 'Yerlik': 'da', 'Çıxışlıq': 'dan'},
-            'u': {'Yiyəlik': 'nun', 'Yönlük': 'ya', 'Təsirlik': 'nu', 'Yerlik': 'da', 'Çıxışlıq': 'dan'},
-            'ö': {'Yiyəlik': 'nün', 'Yönlük': 'yə', 'Təsirlik': 'nü', 'Yerlik': 'də', 'Çıxışlıq': 'dən'},
-            'ü': {'Yiyəlik': 'nün', 'Yönlük': 'yə', 'Təsirlik': 'nü', 'Yerlik': 'də', 'Çıxışlıq': 'dən'}
-        }
-        suffix = case_map.get(last_v, {}).get(case, '')
-        return f"{word}{suffix}"
+    return inflect(word, ('Hal', case))
 
 def generate_possessive(word, person="1s", plural=False):
-    if word in SPECIAL_WORDS and person in SPECIAL_WORDS[word].get('possessive', {}):
-        return SPECIAL_WORDS[word]['possessive'][person]
-    last_v = get_last_vowel(word)
-    if not last_v:
-        return word
-    base = generate_plural(word) if plural else word
-    # Vowel-ending words
-    if word[-1] in VOWELS:
-        suffix_map = {
-            "1s": {"a": "m", "ı": "m", "ə": "m", "i": "m", "o": "m", "u": "m", "ö": "m", "ü": "m"},
-            "2s": {"a": "n", "ı": "n", "ə": "n", "i": "n", "o": "n", "u": "n", "ö": "n", "ü": "n"},
-            "3s": {"a": "sı", "ı": "sı", "ə": "si", "i": "si", "o": "su", "u": "su", "ö": "sü", "ü": "sü"},
-            "1p": {"a": "mız", "ı": "mız", "ə": "miz", "i": "miz", "o": "muz", "u": "muz", "ö": "müz", "ü": "müz"},
-            "2p": {"a": "nız", "ı": "nız", "ə": "niz", "i": "niz", "o": "nuz", "u": "nuz", "ö": "nüz", "ü": "nüz"},
-            "3p": {"a": "ları", "ı": "ları", "ə": "ləri", "i": "ləri", "o": "ları", "u": "ları", "ö": "ləri", "ü": "ləri"}
-        }
-        suffix = suffix_map.get(person, {}).get(last_v, "")
-        return f"{base}{suffix}"
-    # Consonant-ending words
-    else:
-        suffix_map = {
-            "1s": {"a": "ım", "ı": "ım", "ə": "im", "i": "im", "o": "um", "u": "um", "ö": "üm", "ü": "üm"},
-            "2s": {"a": "ın", "ı": "ın", "ə": "in", "i": "in", "o": "un", "u": "un", "ö": "ün", "ü": "ün"},
-            "3s": {"a": "ı", "ı": "ı", "ə": "i", "i": "i", "o": "u", "u": "u", "ö": "ü", "ü": "ü"},
-            "1p": {"a": "ımız", "ı": "ımız", "ə": "imiz", "i": "imiz", "o": "umuz", "u": "umuz", "ö": "ümüz", "ü": "ümüz"},
-            "2p": {"a": "ınız", "ı": "ınız", "ə": "iniz", "i": "iniz", "o": "unuz", "u": "unuz", "ö": "ünüz", "ü": "ünüz"},
-            "3p": {"a": "ları", "ı": "ları", "ə": "ləri", "i": "ləri", "o": "ları", "u": "ları", "ö": "ləri", "ü": "ləri"}
-        }
-        suffix = suffix_map.get(person, {}).get(last_v, "")
-        return f"{base}{suffix}"
+    return inflect(word, ('Mənsubiyyət', f"{person}_{'cəm' if plural else 'tək'}"))
 
 def generate_xeberlik(word, person="3s"):
-    last_v = get_last_vowel(word)
-    if not last_v:
-        return word
-    # Vowel-ending words
-    if word[-1] in VOWELS:
-        suffix_map = {
-            "1s": {"a": "yam", "ı": "yam", "ə": "yəm", "i": "yəm", "o": "yam", "u": "yam", "ö": "yəm", "ü": "yəm"},
-            "2s": {"a": "san", "ı": "san", "ə": "sən", "i": "sən", "o": "san", "u": "san", "ö": "sən", "ü": "sən"},
-            "3s": {"a": "dır", "ı": "dır", "ə": "dir", "i": "dir", "o": "dur", "u": "dur", "ö": "dür", "ü": "dür"},
-            "1p": {"a": "yıq", "ı": "yıq", "ə": "yik", "i": "yik", "o": "yuq", "u": "yuq", "ö": "yük", "ü": "yük"},
-            "2p": {"a": "sınız", "ı": "sınız", "ə": "siniz", "i": "siniz", "o": "sunuz", "u": "sunuz", "ö": "sünüz", "ü": "sünüz"},
-            "3p": {"a": "dırlar", "ı": "dırlar", "ə": "dirlər", "i": "dirlər", "o": "durlar", "u": "durlar", "ö": "dürlər", "ü": "dürlər"}
-        }
-        suffix = suffix_map.get(person, {}).get(last_v, "")
-        return f"{word}{suffix}"
-    # Consonant-ending words
+    return inflect(word, ('Xəbərlik', XEBERLIK_PERSON_NAMES.get(person, person)))
+
+# ==================== TƏRSİNƏ TƏHLİL (ANALİZATOR) ====================
+class Analysis(namedtuple('Analysis', ['root', 'suffixes', 'category', 'slot'])):
+    """Bir təhlil: kök, şəkilçi zənciri (məs. ('lar', 'ım')), kateqoriya və slot."""
+    __slots__ = ()
+
+    @property
+    def form(self):
+        return self.root + ''.join(self.suffixes)
+
+def _suffix_chain(*parts):
+    return tuple(p for p in parts if p)
+
+def _trie_insert(trie, chain, entry):
+    """Şəkilçi zəncirini tərsinə (sondan əvvələ) trie-yə yazır; qeydlər None açarında saxlanır."""
+    node = trie
+    for ch in reversed(''.join(chain)):
+        node = node.setdefault(ch, {})
+    node.setdefault(None, []).append(entry)
+
+def _compile_suffix_trie():
+    """Generatorların çıxara biləcəyi bütün şəkilçi zəncirlərini tərsinə trie-yə yığır.
+
+    Müntəzəm qeyd: (sinif, None, slot, zəncir) - kök həmin fonoloji sinifdən olmalıdır (ahəng yoxlaması).
+    SPECIAL_WORDS qeydi: (None, söz, slot, zəncir) - yalnız həmin kökə uyğun gəlir.
+    """
+    trie = {}
+    for cls, suffixes in PARADIGM_TABLES.items():
+        for slot, suffix in zip(PARADIGM_SLOTS, suffixes):
+            plural = suffixes[0] if slot in PLURAL_BASED_SLOTS else ''
+            chain = _suffix_chain(plural, suffix)
+            _trie_insert(trie, chain, (cls, None, slot, chain))
+    for word in SPECIAL_FORMS:
+        for record in paradigm_records(word):
+            stem = record.stem
+            chain = _suffix_chain(stem[len(word):] if stem.startswith(word) else stem, record.suffix)
+            _trie_insert(trie, chain, (None, word, (record.category, record.slot), chain))
+    return trie
+
+SUFFIX_TRIE = _compile_suffix_trie()
+
+def _bare_last(results, chain_of):
+    """Şəkilçisiz (bütöv kök) təhlilləri siyahının sonuna keçirir."""
+    return [r for r in results if chain_of(r)] + [r for r in results if not chain_of(r)]
+
+def analyze(form):
+    """Səth formasını generatorların verə biləcəyi (kök, şəkilçi zənciri, slot) təhlillərinə ayırır.
+
+    Yalnız bir slotluq formalar (paradigm) təhlil olunur; qat-qat formalar üçün analyze_stacked.
+    Şəkilçisiz (Adlıq) təhlil həmişə qaytarılır, şəkilçili təhlillərdən sonra.
+    """
+    results = []
+    node = SUFFIX_TRIE
+    i = len(form)
+    while node is not None and i > 0:
+        entries = node.get(None)
+        if entries:
+            root = form[:i]
+            cls = classify_word(root)
+            special = root in SPECIAL_FORMS
+            for entry_cls, entry_root, slot, chain in entries:
+                if entry_root is None:
+                    # Vokal ahəngi: zəncir kökün öz sinfi üçün qurulmuş olmalıdır
+                    if special or entry_cls != cls:
+                        continue
+                elif entry_root != root:
+                    continue
+                results.append(Analysis(root, chain, slot[0], slot[1]))
+        node = node.get(form[i - 1])
+        i -= 1
+    return _bare_last(results, lambda a: a.suffixes)
+
+# Heç bir qatı olmayan seçim: cəmsiz, mənsubiyyətsiz, Adlıq, xəbərliksiz
+BARE_STACK = (False, None, 'Adlıq', None)
+
+def _class_sample(cls):
+    """Saitli fonoloji sinfin nümunə kökü (SPECIAL_WORDS-da olmayan)."""
+    last_v, vowel_final = cls
+    return 'b' + last_v if vowel_final else 'b' + last_v + 'b'
+
+@functools.lru_cache(maxsize=None)
+def stacked_suffix_trie():
+    """Qat-qat formaların şəkilçi zəncirlərinin tərsinə trie-si; hər fonoloji sinif üçün bir nümunə kökdən qurulur."""
+    trie = {}
+    combos = [combo for combo in _stack_combos() if combo != BARE_STACK]
+    for cls in PARADIGM_TABLES:
+        _trie_insert(trie, (), (cls, None, BARE_STACK, ()))
+        if cls[0] is None:
+            continue
+        sample = _class_sample(cls)
+        cache = {}
+        for combo in combos:
+            _, suffixes = _stack(sample, combo, cache)
+            if suffixes:
+                _trie_insert(trie, suffixes, (cls, None, combo, suffixes))
+    for word in SPECIAL_SPLITS:
+        _trie_insert(trie, (), (None, word, BARE_STACK, (word, ())))
+        cache = {}
+        for combo in combos:
+            stem, suffixes = _stack(word, combo, cache)
+            chain = _suffix_chain(stem[len(word):] if stem.startswith(word) else stem, *suffixes)
+            if chain:
+                _trie_insert(trie, chain, (None, word, combo, (stem, suffixes)))
+    return trie
+
+def analyze_stacked(form):
+    """Qat-qat formanı (cəm + mənsubiyyət + hal + xəbərlik) iter_stacked_forms-un verə biləcəyi StackedForm-lara ayırır.
+
+    Şəkilçisiz təhlil (BARE_STACK) həmişə qaytarılır, şəkilçili təhlillərdən sonra.
+    """
+    results = []
+    node = stacked_suffix_trie()
+    i = len(form)
+    while node is not None and i > 0:
+        entries = node.get(None)
+        if entries:
+            root = form[:i]
+            cls = classify_word(root)
+            special = root in SPECIAL_FORMS
+            for entry_cls, entry_root, combo, parts in entries:
+                if entry_root is None:
+                    if special or entry_cls != cls:
+                        continue
+                    results.append(StackedForm(root, root, parts, *combo))
+                elif entry_root == root:
+                    results.append(StackedForm(root, parts[0], parts[1], *combo))
+        node = node.get(form[i - 1])
+        i -= 1
+    return _bare_last(results, lambda a: a.form != a.word)
+
+def analyze_batch(forms, stacked=False):
+    """Formalar siyahısını təhlil edir (stacked=True - analyze_stacked ilə); təkrarlanan formalar bir dəfə təhlil olunur."""
+    analyzer = analyze_stacked if stacked else analyze
+    seen = {}
+    results = []
+    for form in forms:
+        analyses = seen.get(form)
+        if analyses is None:
+            analyses = seen[form] = analyzer(form)
+        results.append(analyses)
+    return results
+
+
+# ==================== QAT-QAT FORMALAR (ŞƏKİLÇİ ZƏNCİRLƏRİ) ====================
+# Şəkilçilər bu sıra ilə yığılır: cəm + mənsubiyyət + hal + xəbərlik (məs. kitab+lar+ımız+da+dır).
+# Hər sərhəddə şəkilçi o ana qədər alınmış əsasın sinfinə (son sait, saitlə bitmə) görə seçilir.
+# 3-cü şəxs mənsubiyyətindən sonra Yönlük/Yerlik/Çıxışlıq şəkilçisi bitişdirici -n- ilə başlayır:
+# kitabı+na, kitabı+nda, kitabları+ndan (kitabı+ya, kitabı+da yox).
+# Cəmdən sonra 3-cü şəxs cəm mənsubiyyəti ı/i ilə düzəlir: kitablar+ı (kitablar+ları yox). Bu forma
+# cəmsiz 3p ilə (kitab+ları) eynidir, ona görə cəmsiz variant da seçilibsə cəm+3p kombinasiyası atılır.
+PRONOMINAL_N_PERSONS = frozenset({'3s', '3p'})
+PRONOMINAL_N_CASES = frozenset({'Yönlük', 'Yerlik', 'Çıxışlıq'})
+class StackedForm(namedtuple('StackedForm', ['word', 'stem', 'suffixes', 'plural', 'possessive', 'case', 'xeberlik'])):
+    """Qat-qat forma: söz, kök, şəkilçi zənciri və hər qatın seçimi (None - həmin qat yoxdur)."""
+    __slots__ = ()
+
+    @property
+    def form(self):
+        return self.stem + ''.join(self.suffixes)
+
+def stack_options(plural=(False, True), possessive=(None,) + tuple(PERSONS), case=tuple(CASES),
+                  xeberlik=(None,) + tuple(PERSONS)):
+    """Hər qat üçün seçimləri yoxlayıb qaytarır; Adlıq halı şəkilçisizdir."""
+    for name, values, allowed in (
+        ('plural', plural, (False, True)), ('possessive', possessive, (None,) + tuple(PERSONS)),
+        ('case', case, tuple(CASES)), ('xeberlik', xeberlik, (None,) + tuple(PERSONS))
+    ):
+        unknown = [v for v in values if v not in allowed]
+        if unknown:
+            raise ValueError(f"Naməlum {name} seçimi: {unknown}")
+    return tuple(plural), tuple(possessive), tuple(case), tuple(xeberlik)
+
+def _layer_slot(layer, value):
+    """Qat seçimini cədvəldəki slota çevirir; şəkilçisiz seçim üçün None."""
+    if layer == 0:
+        return PARADIGM_SLOTS[0] if value else None
+    if layer == 1:
+        return ('Mənsubiyyət', f"{value}_tək") if value else None
+    if layer == 2:
+        return ('Hal', value) if value != 'Adlıq' else None
+    return ('Xəbərlik', XEBERLIK_PERSON_NAMES[value]) if value else None
+
+def _pronominal_case_suffix(base, case):
+    """3-cü şəxs mənsubiyyətli əsasa artırılan hal şəkilçisi: n + samitlə bitən əsasın şəkilçisi (na, nda, ndan)."""
+    suffix = CASE_SUFFIXES_CONSONANT.get(get_last_vowel(base), {}).get(case, '')
+    return 'n' + suffix if suffix else ''
+
+def _stack(word, combo, cache):
+    """Bir seçim kombinasiyasının (kök, şəkilçilər) cütünü qurur; ortaq prefikslər cache-dən götürülür."""
+    stem, suffixes = word, ()
+    for layer in range(len(combo)):
+        key = combo[:layer + 1]
+        cached = cache.get(key)
+        if cached is None:
+            slot = _layer_slot(layer, '3s' if layer == 1 and combo[0] and combo[1] == '3p' else combo[layer])
+            if slot is not None:
+                overrides = SPECIAL_SPLITS.get(word)
+                if not suffixes and overrides and slot in overrides:
+                    # Qeyri-müntəzəm forma yalnız şəkilçi birbaşa sözə artırılanda işləyir
+                    stem, suffix = overrides[slot]
+                elif layer == 2 and combo[1] in PRONOMINAL_N_PERSONS and combo[2] in PRONOMINAL_N_CASES:
+                    suffix = _pronominal_case_suffix(stem + ''.join(suffixes), combo[2])
+                else:
+                    suffix = PARADIGM_TABLES[classify_word(stem + ''.join(suffixes))][SLOT_INDEX[slot]]
+                if suffix:
+                    suffixes = suffixes + (suffix,)
+            cached = cache[key] = (stem, suffixes)
+        stem, suffixes = cached
+    return stem, suffixes
+
+def _stack_combos(**filters):
+    """Bir söz üçün seçim kombinasiyaları (cəm, mənsubiyyət, hal, xəbərlik) iterasiya sırası ilə."""
+    options = stack_options(**filters)
+    combos = itertools.product(*options)
+    if False in options[0]:
+        combos = (combo for combo in combos if not (combo[0] and combo[1] == '3p'))
+    return list(combos)
+
+def count_stacked_forms(words, **filters):
+    """Qat-qat formaların dəqiq sayı: tək söz üçün və ya bütün leksikon üçün, formaları yaratmadan."""
+    per_word = len(_stack_combos(**filters))
+    if isinstance(words, str):
+        return per_word
+    n = len(words) if hasattr(words, '__len__') else sum(1 for _ in words)
+    return n * per_word
+
+def iter_stacked_forms(words, start=0, stop=None, **filters):
+    """Qat-qat formaları tələb olunduqca verir; start/stop ilə səhifələnir (lazımsız sözlər qurulmur)."""
+    if isinstance(words, str):
+        words = [words]
+    combos = _stack_combos(**filters)
+    if not combos:
+        return
+    first_word, offset = divmod(start, len(combos))
+    remaining = None if stop is None else stop - start
+    for word in itertools.islice(words, first_word, None):
+        cache = {}
+        for combo in combos[offset:]:
+            if remaining is not None:
+                if remaining <= 0:
+                    return
+                remaining -= 1
+            stem, suffixes = _stack(word, combo, cache)
+            yield StackedForm(word, stem, suffixes, *combo)
+        offset = 0
+
+def format_record(record, suffix_examples):
+    """Formanı 'kök+şəkilçi (nümunə)' görünüşünə salır."""
+    stem, suffix = record.stem, record.suffix
+    with_suffix = f"{stem}+{suffix}" if suffix else stem
+    example = suffix_examples.get(suffix, '')
+    return f"{with_suffix} ({example})" if example else with_suffix
+
+def format_columns(stems, suffixes, suffix_examples):
+    """format_record-un massiv variantı: kök və şəkilçi massivlərindən görünüş sütunu qurur."""
+    formatted = np.where(suffixes != '', stems + '+' + suffixes, stems)
+    if suffix_examples:
+        examples = pd.Series(suffixes).map(suffix_examples).fillna('').to_numpy(dtype=object)
+        has_example = examples != ''
+        formatted[has_example] = formatted[has_example] + ' (' + examples[has_example] + ')'
+    return formatted
+
+def build_display_table(words, suffix_examples=None, suffix_index=None):
+    """Sözlərin paradiqmasını İsimlər görünüşündə (şəkilçi və nümunə ilə) qaytarır.
+
+    suffix_index verilibsə (new_suffix_index()), generasiya zamanı şəkilçi indeksi doldurulur.
+    """
+    words, columns = paradigm_arrays(words)
+    if suffix_index is not None:
+        update_suffix_index(suffix_index, words, columns)
+    display = {'Söz': words.to_numpy(dtype=object)}
+    for slot, (stems, suffixes) in zip(PARADIGM_SLOTS, columns):
+        display[slot[1]] = format_columns(stems, suffixes, suffix_examples)
+    return pd.DataFrame(display, index=words.index)
+
+# ==================== GİRİŞİN NORMALLAŞDIRILMASI ====================
+# Azərbaycan əlifbasında böyük İ -> i, I -> ı (str.lower() 'İ'-ni 'i̇', 'I'-ni 'i' edir)
+AZ_LOWER_TABLE = str.maketrans({'İ': 'i', 'I': 'ı'})
+ROW_MAP_SHEET = 'Giriş_Xəritəsi'
+ROW_MAP_COLUMNS = ['Sətir', 'Giriş', 'Söz']
+
+def normalize_word(value):
+    """NFC, kənar boşluqların silinməsi, Azərbaycan dilinə uyğun kiçik hərf; boş/NaN dəyər üçün ''."""
+    if value is None or (isinstance(value, float) and value != value):
+        return ''
+    return unicodedata.normalize('NFC', str(value)).strip().translate(AZ_LOWER_TABLE).lower()
+
+def normalize_words(values):
+    """normalize_word-un sütun üçün vektorlaşdırılmış variantı."""
+    s = pd.Series(values, dtype=object)
+    s = s.where(s.notna(), '').astype(str)
+    return s.str.normalize('NFC').str.strip().str.translate(AZ_LOWER_TABLE).str.lower()
+
+def normalize_input(values):
+    """Girişi normallaşdırır, boşları və təkrarları atır: (unikal lemmalar, giriş sətri -> lemma cədvəli).
+
+    Sətir - giriş faylındakı Excel sətri (başlıq 1-ci sətirdir); atılmış sətirlərin lemması ''-dir.
+    """
+    original = pd.Series(values, dtype=object).reset_index(drop=True)
+    normalized = normalize_words(original)
+    lemmas = normalized[normalized != ''].drop_duplicates().reset_index(drop=True)
+    row_map = pd.DataFrame({
+        'Sətir': original.index + 2,
+        'Giriş': original.where(original.notna(), ''),
+        'Söz': normalized
+    })
+    count('input_rows', len(original))
+    count('dropped_rows', int((normalized == '').sum()))
+    count('duplicate_rows', int((normalized != '').sum()) - len(lemmas))
+    return lemmas, row_map
+
+def iter_normalized_words(values, on_row=None, labelled=False, dedupe=True):
+    """Axın rejimi üçün normallaşdırılmış lemmaları giriş sırası ilə ötürür; on_row(sətir, giriş, lemma) hər sətir üçün.
+
+    labelled=True - values (dəyər, etiket) cütləridir; dedupe=True - hər lemma bir dəfə (ilk sətrinin etiketi ilə).
+    """
+    seen = set() if dedupe else None
+    for row_no, item in enumerate(values, 2):
+        value, label = item if labelled else (item, None)
+        word = normalize_word(value)
+        if on_row is not None:
+            on_row(row_no, value, word)
+        if not word or (seen is not None and word in seen):
+            continue
+        if seen is not None:
+            seen.add(word)
+        yield (word, label) if labelled else word
+
+def _prepare_words(words, normalize, route_pos, pos_labels=None):
+    """Normallaşdırma və nitq hissəsi yönləndirməsi: (paradiqmaya gedən sözlər, {sheet: hesabat cədvəli}).
+
+    route_pos: None - pos_labels varsa onlara görə, True - detect_pos təxmini ilə, False - yönləndirmə yoxdur.
+    """
+    report_sheets = {}
+    row_map = None
+    labels = None
+    if pos_labels is not None and route_pos is not False:
+        labels = normalize_pos_labels(pos_labels)
+    if normalize:
+        with stage('normalize'):
+            words, row_map = normalize_input(words)
+            if labels is not None:
+                labels = first_pos_labels(row_map['Söz'], labels, words)
     else:
-        suffix_map = {
-            "1s": {"a": "am", "ı": "am", "ə": "əm", "i": "əm", "o": "am", "u": "am", "ö": "əm", "ü": "əm"},
-            "2s": {"a": "san", "ı": "san", "ə": "sən", "i": "sən", "o": "san", "u": "san", "ö": "sən", "ü": "sən"},
-            "3s": {"a": "dır", "ı": "dır", "ə": "dir", "i": "dir", "o": "dur", "u": "dur", "ö": "dür", "ü": "dür"},
-            "1p": {"a": "ıq", "ı": "ıq", "ə": "ik", "i": "ik", "o": "uq", "u": "uq", "ö": "ük", "ü": "ük"},
-            "2p": {"a": "sınız", "ı": "sınız", "ə": "siniz", "i": "siniz", "o": "sunuz", "u": "sunuz", "ö": "sünüz", "ü": "sünüz"},
-            "3p": {"a": "dırlar", "ı": "dırlar", "ə": "dirlər", "i": "dirlər", "o": "durlar", "u": "durlar", "ö": "dürlər", "ü": "dürlər"}
-        }
-        suffix = suffix_map.get(person, {}).get(last_v, "")
-        return f"{word}{suffix}"
+        words = _word_series(words)
+    if route_pos or labels is not None:
+        with stage('pos_routing'):
+            report_sheets[POS_SHEET], words = route_by_pos(words, labels, guess=route_pos is True)
+    if row_map is not None:
+        report_sheets[ROW_MAP_SHEET] = row_map
+    return words, report_sheets
+
+# ==================== NİTQ HİSSƏLƏRİ ÜZRƏ YÖNLƏNDİRMƏ ====================
+# Yalnız bu nitq hissələri isim paradiqması ilə hallanır; qalanları yalnız Nitq_Hissələri sheet-inə düşür.
+# Girişdə 'Nitq hissəsi' sütunu varsa, yönləndirmə onun etiketlərinə görə aparılır; detect_pos-un sonluq
+# qaydaları (-la, -ca, -maq və s.) həqiqi isimləri də tutduğu üçün yalnız route_pos=True ilə işə düşür.
+PARADIGM_POS = frozenset({"İsim", "Sifət"})
+POS_SHEET = 'Nitq_Hissələri'
+POS_SHEET_COLUMNS = ['Söz', 'Nitq hissəsi']
+POS_INPUT_COLUMN = 'Nitq hissəsi'
+# Giriş etiketlərinin yazılış variantları (normallaşdırılmış şəkildə) -> nitq hissəsi; tanınmayan etiket yox sayılır
+POS_LABEL_ALIASES = {
+    **{normalize_word(pos): pos for pos, _ in POS_WORD_SETS + POS_ENDINGS},
+    normalize_word(DEFAULT_POS): DEFAULT_POS,
+    'feil': 'Fel', 'bağlayıcı': 'Qoşma', 'modal söz': 'Modal söz', 'köməkçi söz': 'Köməkçi söz'
+}
+
+def normalize_pos_labels(labels):
+    """Giriş etiketlərini nitq hissəsi adlarına çevirir ('isim ' -> 'İsim', 'feil' -> 'Fel'); tanınmayanlar NaN olur."""
+    labels = pd.Series(labels, dtype=object)
+    return normalize_words(labels).map(POS_LABEL_ALIASES).set_axis(labels.index)
+
+def first_pos_labels(row_words, labels, lemmas):
+    """Giriş sətirlərinin etiketlərini unikal lemmalara köçürür: hər lemma ilk göründüyü sətrin etiketini alır."""
+    first = pd.Series(labels.to_numpy(), index=pd.Index(row_words.to_numpy()))
+    first = first[~first.index.duplicated()]
+    return lemmas.map(first)
+
+def detect_pos_batch(words):
+    """Söz sütunu üçün detect_pos: əvvəlcədən qurulmuş çoxluqlar və vektorlaşdırılmış endswith maskaları ilə."""
+    words = _word_series(words)
+    conditions = [words.isin(members).to_numpy() for _, members in POS_WORD_SETS]
+    conditions += [words.str.endswith(endings).to_numpy(dtype=bool) for _, endings in POS_ENDINGS]
+    choices = [pos for pos, _ in POS_WORD_SETS + POS_ENDINGS]
+    tags = np.select(conditions, choices, default=DEFAULT_POS).astype(object)
+    return pd.Series(tags, index=words.index, name=POS_SHEET_COLUMNS[1])
+
+def route_by_pos(words, labels=None, guess=True):
+    """Sözləri nitq hissələrinə ayırır: (Söz/Nitq hissəsi cədvəli, paradiqmaya göndəriləcək sözlər)."""
+    words = _word_series(words).reset_index(drop=True)
+    values = None if labels is None else pd.Series(labels, dtype=object).to_numpy()
+    tags = pd.Series(values, index=words.index, dtype=object, name=POS_SHEET_COLUMNS[1])
+    missing = tags.isna()
+    if missing.any():
+        tags[missing] = detect_pos_batch(words[missing]).to_numpy() if guess else DEFAULT_POS
+    pos_table = pd.DataFrame({POS_SHEET_COLUMNS[0]: words, POS_SHEET_COLUMNS[1]: tags})
+    routed = words[tags.isin(PARADIGM_POS)].reset_index(drop=True)
+    count('skipped_words', len(words) - len(routed))
+    return pos_table, routed
+
+def iter_routed_words(pairs, on_word=None, guess=True):
+    """Axın rejimi üçün (söz, etiket) cütlərini yönləndirir; on_word(söz, nitq hissəsi) hər söz üçün çağırılır."""
+    for word, label in pairs:
+        pos = POS_LABEL_ALIASES.get(normalize_word(label))
+        if pos is None:
+            pos = detect_pos(word) if guess else DEFAULT_POS
+        if on_word is not None:
+            on_word(word, pos)
+        if pos in PARADIGM_POS:
+            yield word
+
+# ==================== İNSTRUMENTASİYA ====================
+logger = logging.getLogger('sufi')
+
+# profile: True - cProfile xülasəsi hesabata əlavə olunur, sətir - həm də .prof faylına yazılır
+# report_file: hər işin JSON hesabatı bu fayla sətir-sətir (JSON Lines) əlavə olunur
+INSTRUMENTATION = {'profile': False, 'report_file': None}
+_INSTRUMENTATION_HOOKS = []
+_active_run = None
+
+def configure_instrumentation(profile=False, report_file=None):
+    INSTRUMENTATION['profile'] = profile
+    INSTRUMENTATION['report_file'] = report_file
+
+def add_instrumentation_hook(callback):
+    """callback(event) hər mərhələnin ('event': 'stage') və hər işin ('event': 'run') sonunda çağırılır."""
+    _INSTRUMENTATION_HOOKS.append(callback)
+
+def remove_instrumentation_hook(callback):
+    if callback in _INSTRUMENTATION_HOOKS:
+        _INSTRUMENTATION_HOOKS.remove(callback)
+
+def _notify(event):
+    for callback in list(_INSTRUMENTATION_HOOKS):
+        callback(event)
+
+def instrumentation_active():
+    """--profile, --report və ya qeydiyyatdan keçmiş hook varsa True."""
+    return bool(INSTRUMENTATION['profile'] or INSTRUMENTATION['report_file'] or _INSTRUMENTATION_HOOKS)
+
+def peak_rss_mb():
+    """Prosesin maksimum RSS-i (MB) - son reset_peak_rss()-dən bəri; resource modulu olmayan sistemlərdə None."""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux-da KB, macOS-da bayt
+    return round(rss / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def reset_peak_rss():
+    """Linux-da RSS zirvəsini (VmHWM, ru_maxrss) cari RSS-ə endirir; mümkün olmayanda False qaytarır."""
+    if resource is None or not sys.platform.startswith('linux'):
+        return False
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        return False
+    return True
+
+# Açıq track_peak_rss bloklarının indiyə qədərki zirvələri (iç-içə bloklar üçün yığın)
+_open_peaks = []
+
+def _fold_peak(peak):
+    for i, value in enumerate(_open_peaks):
+        _open_peaks[i] = max(value, peak)
+
+@contextmanager
+def track_peak_rss(reset=None):
+    """Blok ərzindəki RSS zirvəsini (MB) 'peak_rss_mb' açarına yazır; reset=None - yalnız instrumentasiya aktivdirsə."""
+    if reset is None:
+        reset = instrumentation_active()
+    result = {'peak_rss_mb': None}
+    current = peak_rss_mb()
+    if current is not None:
+        _fold_peak(current)
+    tracked = reset and current is not None and reset_peak_rss()
+    if tracked:
+        _open_peaks.append(peak_rss_mb())
+    try:
+        yield result
+    finally:
+        if tracked:
+            peak = max(_open_peaks.pop(), peak_rss_mb())
+            _fold_peak(peak)
+            result['peak_rss_mb'] = peak
+        else:
+            result['peak_rss_mb'] = peak_rss_mb()
+
+def count(name, n=1):
+    """Aktiv işin sayğacını artırır (söz, forma, sətir, sheet, saxlama və s.)."""
+    if _active_run is not None:
+        _active_run['counters'][name] = _active_run['counters'].get(name, 0) + n
+
+@contextmanager
+def stage(name):
+    """Mərhələnin vaxtını və öz RSS zirvəsini ölçür; eyni adlı mərhələlər hesabatda toplanır."""
+    start = time.perf_counter()
+    try:
+        with track_peak_rss() as peak:
+            yield
+    finally:
+        seconds = time.perf_counter() - start
+        rss = peak['peak_rss_mb']
+        if _active_run is not None:
+            entry = _active_run['stages'].setdefault(name, {'seconds': 0.0, 'calls': 0, 'peak_rss_mb': None})
+            entry['seconds'] = round(entry['seconds'] + seconds, 4)
+            entry['calls'] += 1
+            if rss is not None:
+                entry['peak_rss_mb'] = max(entry['peak_rss_mb'] or 0, rss)
+        _notify({
+            'event': 'stage', 'run': _active_run['run'] if _active_run else None,
+            'stage': name, 'seconds': round(seconds, 4), 'peak_rss_mb': rss
+        })
+
+def _profile_summary(profiler, limit=25):
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(limit)
+    return out.getvalue()
+
+def _emit_report(report):
+    logger.info(json.dumps(report, ensure_ascii=False))
+    if INSTRUMENTATION['report_file']:
+        with open(INSTRUMENTATION['report_file'], 'a', encoding='utf-8') as f:
+            f.write(json.dumps(report, ensure_ascii=False) + '\n')
+    _notify(dict(report, event='run'))
+
+@contextmanager
+def pipeline_run(name):
+    """Bir işin (process_words və s.) mərhələlərini və sayğaclarını toplayır, sonda hesabat verir.
+
+    Başqa işin içində çağırılanda ayrıca hesabat vermir, sadəcə mərhələ kimi sayılır.
+    """
+    global _active_run
+    if _active_run is not None:
+        with stage(name):
+            yield _active_run
+        return
+    report = {'run': name, 'stages': {}, 'counters': {}}
+    profiler = cProfile.Profile() if INSTRUMENTATION['profile'] else None
+    _active_run = report
+    start = time.perf_counter()
+    if profiler:
+        profiler.enable()
+    try:
+        with track_peak_rss() as peak:
+            yield report
+    finally:
+        if profiler:
+            profiler.disable()
+        _active_run = None
+        report['seconds'] = round(time.perf_counter() - start, 4)
+        report['peak_rss_mb'] = peak['peak_rss_mb'] if peak['peak_rss_mb'] is not None else peak_rss_mb()
+        if profiler:
+            report['profile'] = _profile_summary(profiler)
+            if isinstance(INSTRUMENTATION['profile'], str):
+                profiler.dump_stats(INSTRUMENTATION['profile'])
+        _emit_report(report)
+
+def instrumented(name):
+    """Funksiyanı pipeline_run(name) ilə əhatə edən dekorator."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with pipeline_run(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+@contextmanager
+def excel_writer(output_file, **kwargs):
+    """pd.ExcelWriter; sheet-lərin yazılması və faylın saxlanması ayrı mərhələlər kimi ölçülür."""
+    writer = pd.ExcelWriter(output_file, engine='openpyxl', **kwargs)
+    try:
+        with stage('excel_write'):
+            yield writer
+    finally:
+        with stage('excel_save'):
+            writer.close()
+        count('saves')
+
+def write_sheet(writer, df, sheet_name, index=False):
+    """DataFrame-i sheet-ə yazır və sheet/sətir sayğaclarını artırır."""
+    df.to_excel(writer, sheet_name=sheet_name, index=index)
+    count('sheets')
+    count('rows', len(df))
+
+def save_workbook(wb, output_file):
+    """openpyxl iş kitabını saxlayır (excel_save mərhələsi)."""
+    with stage('excel_save'):
+        wb.save(output_file)
+    count('saves')
+
+# ==================== ÇOXPROSESLİ GENERASİYA ====================
+def _display_chunk(words, suffix_examples, with_index=False):
+    """İşçi prosesdə bir hissənin görünüş cədvəlini qurur (cədvəllər prosesdə import zamanı bir dəfə qurulur)."""
+    start = time.perf_counter()
+    suffix_index = new_suffix_index() if with_index else None
+    display = build_display_table(words, suffix_examples, suffix_index=suffix_index)
+    return display, os.getpid(), len(words), time.perf_counter() - start, suffix_index
+
+def build_display_table_parallel(words, suffix_examples=None, workers=1, chunk_size=None, suffix_index=None):
+    """build_display_table-ın çoxprosesli variantı; hissələr giriş sırası ilə birləşdirilir."""
+    if workers <= 1:
+        return build_display_table(words, suffix_examples, suffix_index)
+    words = _word_series(words)
+    chunk_size = chunk_size or max(1, -(-len(words) // (workers * 4)))
+    chunks = [words.iloc[i:i + chunk_size] for i in range(0, len(words), chunk_size)]
+    if not chunks:
+        return build_display_table(words, suffix_examples, suffix_index=suffix_index)
+
+    parts = []
+    stats = {}
+    with_index = [suffix_index is not None] * len(chunks)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for display, pid, n_words, elapsed, part_index in pool.map(
+            _display_chunk, chunks, [suffix_examples] * len(chunks), with_index
+        ):
+            parts.append(display)
+            if part_index is not None:
+                merge_suffix_index(suffix_index, part_index)
+            worker = stats.setdefault(pid, {'chunks': 0, 'words': 0, 'seconds': 0.0})
+            worker['chunks'] += 1
+            worker['words'] += n_words
+            worker['seconds'] += elapsed
+    report_worker_stats(stats)
+    return pd.concat(parts)
+
+def report_worker_stats(stats):
+    """İşçi proseslərin söz sayı və sürətini çap edir."""
+    for pid, s in sorted(stats.items()):
+        rate = s['words'] / s['seconds'] if s['seconds'] else 0
+        print(f"⚙️ Proses {pid}: {s['chunks']} hissə, {s['words']} söz, {s['seconds']:.2f} s, {rate:.0f} söz/s")
 
 # ==================== ƏSAS EMAL FUNKSİYASI ====================
-def process_words(input_file, output_file, suffixes_file=None):
-    df_input = pd.read_excel(input_file)
-    words = df_input['Söz'].astype(str).tolist()
+@instrumented('process_words')
+def process_words(input_file, output_file, suffixes_file=None, rows_per_shard=EXCEL_MAX_ROWS - 1, manifest_file=None,
+                  workers=1, route_pos=None, normalize=True, row_map=False, suffix_index=None):
+    """Sözləri oxuyur, paradiqmaları qurur və sheet-lərə yazır; suffix_index verilibsə generasiya zamanı doldurulur.
+
+    Girişdə 'Nitq hissəsi' sütunu varsa, sözlər onun etiketlərinə görə yönləndirilir (route_pos: _prepare_words).
+    """
+    with stage('read_input'):
+        df_input = pd.read_excel(input_file)
+    words, report_sheets = _prepare_words(df_input['Söz'], normalize, route_pos, df_input.get(POS_INPUT_COLUMN))
+    if not row_map:
+        report_sheets.pop(ROW_MAP_SHEET, None)
 
     suffix_examples = {}
     if suffixes_file:
         suffix_examples = read_suffix_examples_from_excel(suffixes_file)
 
-    results = {
-        'Bütün_Sözlər': [],
-        'Cəm_Formaları': [],
-        'Hal_Şəkilçiləri': [],
-        'Mənsubiyyət_Şəkilçiləri': [],
-        'Xəbərlik_Şəkilçiləri': []
-    }
+    with stage('generation'):
+        results = build_result_sheets(build_display_table_parallel(
+            words, suffix_examples, workers, suffix_index=suffix_index
+        ))
+        manifest = build_shard_manifest(words, rows_per_shard)
+    count('words', len(words))
+    count('forms', len(words) * len(PARADIGM_SLOTS))
 
-    cases = ['Adlıq', 'Yiyəlik', 'Yönlük', 'Təsirlik', 'Yerlik', 'Çıxışlıq']
-    persons = ['1s', '2s', '3s', '1p', '2p', '3p']
-    person_names = ['mən', 'sən', 'o', 'biz', 'siz', 'onlar']
-
-    for word in words:
-        # Cəm forması
-        plural = generate_plural(word)
-        suffix = plural.replace(word, '')
-        plural_with_suffix = f"{word}+{suffix}" if suffix else word
-        example = suffix_examples.get(suffix, '')
-        plural_with_example = f"{plural_with_suffix} ({example})" if example else plural_with_suffix
-        results['Cəm_Formaları'].append({'Söz': word, 'Cəm forması': plural_with_example})
-        results['Bütün_Sözlər'].append({'Yeni Söz': plural_with_example})
-
-        # Hal şəkilçiləri
-        case_data = {'Söz': word}
-        for case in cases:
-            form = generate_case(word, case)
-            suffix = form.replace(word, '')
-            case_form = f"{word}+{suffix}" if suffix else word
-            example = suffix_examples.get(suffix, '')
-            case_form_with_example = f"{case_form} ({example})" if example else case_form
-            case_data[case] = case_form_with_example
-            results['Bütün_Sözlər'].append({'Yeni Söz': case_form_with_example})
-        results['Hal_Şəkilçiləri'].append(case_data)
-
-        # Mənsubiyyət şəkilçiləri
-        poss_data = {'Söz': word}
-        for p in persons:
-            tek_form = generate_possessive(word, p)
-            tek_suffix = tek_form.replace(word, '')
-            tek_word = f"{word}+{tek_suffix}" if tek_suffix else word
-            example = suffix_examples.get(tek_suffix, '')
-            tek_word_with_example = f"{tek_word} ({example})" if example else tek_word
-            poss_data[p + "_tək"] = tek_word_with_example
-            results['Bütün_Sözlər'].append({'Yeni Söz': tek_word_with_example})
-
-            plural_root = generate_plural(word)
-            cem_form = generate_possessive(word, p, plural=True)
-            cem_suffix = cem_form.replace(plural_root, '')
-            cem_word = f"{plural_root}+{cem_suffix}" if cem_suffix else plural_root
-            example = suffix_examples.get(cem_suffix, '')
-            cem_word_with_example = f"{cem_word} ({example})" if example else cem_word
-            poss_data[p + "_cəm"] = cem_word_with_example
-            results['Bütün_Sözlər'].append({'Yeni Söz': cem_word_with_example})
-        results['Mənsubiyyət_Şəkilçiləri'].append(poss_data)
-
-        # Xəbərlik şəkilçiləri
-        x_data = {'Söz': word}
-        for p, name in zip(persons, person_names):
-            form = generate_xeberlik(word, p)
-            suffix = form.replace(word, '')
-            xeberlik_form = f"{word}+{suffix}" if suffix else word
-            example = suffix_examples.get(suffix, '')
-            xeberlik_form_with_example = f"{xeberlik_form} ({example})" if example else xeberlik_form
-            x_data[name] = xeberlik_form_with_example
-            results['Bütün_Sözlər'].append({'Yeni Söz': xeberlik_form_with_example})
-        results['Xəbərlik_Şəkilçiləri'].append(x_data)
-
-    # Excel-ə yazma
-    with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
-        pd.DataFrame(results['Bütün_Sözlər']).to_excel(writer, sheet_name='Bütün_Sözlər', index=False)
-        for sheet in ['Cəm_Formaları', 'Hal_Şəkilçiləri', 'Mənsubiyyət_Şəkilçiləri', 'Xəbərlik_Şəkilçiləri']:
-            pd.DataFrame(results[sheet]).to_excel(writer, sheet_name=sheet, index=False)
-
-    wb = load_workbook(output_file)
-    for sheet in wb.sheetnames:
-        ws = wb[sheet]
-        for col in ws.columns:
-            max_len = max(len(str(cell.value or '')) for cell in col)
-            ws.column_dimensions[get_column_letter(col[0].column)].width = max_len + 2
-    wb.save(output_file)
+    # Excel-ə yazma (enlər yaddaşdakı iş kitabında təyin olunur, fayl bir dəfə saxlanır)
+    with excel_writer(output_file) as writer:
+        for sheet, df in results.items():
+            if sheet == 'Bütün_Sözlər':
+                write_all_words_shards(writer, df, manifest)
+                continue
+            write_sheet(writer, df, sheet)
+            set_column_widths(writer.sheets[sheet], df)
+        for sheet, df in report_sheets.items():
+            write_sheet(writer, df, sheet)
+            set_column_widths(writer.sheets[sheet], df)
+    if manifest_file:
+        write_shard_manifest(manifest, manifest_file)
     print(f"✅ Excel faylı '{output_file}' uğurla yaradıldı!")
+    return manifest
+
+# process_words sheet-lərinin sütunları (Bütün_Sözlər-dən başqa, o tək 'Yeni Söz' sütunludur)
+RESULT_SHEET_COLUMNS = {
+    'Cəm_Formaları': ['Söz', 'Cəm forması'],
+    'Hal_Şəkilçiləri': ['Söz'] + CASES,
+    'Mənsubiyyət_Şəkilçiləri': ['Söz'] + [key for cat, key in PARADIGM_SLOTS if cat == 'Mənsubiyyət'],
+    'Xəbərlik_Şəkilçiləri': ['Söz'] + PERSON_NAMES
+}
+
+def build_result_sheets(display):
+    """Görünüş cədvəlindən process_words sheet-lərini (DataFrame kimi) qurur."""
+    slot_columns = [key for _, key in PARADIGM_SLOTS]
+    # Hər söz üçün formalar slot sırası ilə ardıcıl sətirlərə düzülür
+    results = {'Bütün_Sözlər': pd.DataFrame({'Yeni Söz': display[slot_columns].to_numpy().ravel()})}
+    for sheet, columns in RESULT_SHEET_COLUMNS.items():
+        results[sheet] = display[columns]
+    return results
+
+def set_column_widths(ws, df=None, index=False):
+    """Sütun enini ən uzun dəyərə görə təyin edir; df verilibsə uzunluqlar xanalardan yox, cədvəldən hesablanır."""
+    with stage('width_pass'):
+        for i, max_len in enumerate(column_text_widths(ws, df, index), 1):
+            ws.column_dimensions[get_column_letter(i)].width = max_len + 2
+
+# ==================== BÜTÜN_SÖZLƏR-İN HİSSƏLƏRƏ BÖLÜNMƏSİ ====================
+def all_words_sheet_name(shard):
+    """Hissənin sheet adı: 1 -> 'Bütün_Sözlər', 2 -> 'Bütün_Sözlər_2' və s."""
+    return 'Bütün_Sözlər' if shard == 1 else f'Bütün_Sözlər_{shard}'
+
+def words_per_shard(rows_per_shard):
+    """Bir hissəyə düşən söz sayı; bir sözün formaları iki hissəyə bölünmür."""
+    if rows_per_shard < len(PARADIGM_SLOTS):
+        raise ValueError(f"rows_per_shard ən azı {len(PARADIGM_SLOTS)} olmalıdır")
+    return rows_per_shard // len(PARADIGM_SLOTS)
+
+def track_shards(words, manifest, rows_per_shard=EXCEL_MAX_ROWS - 1):
+    """Sözləri olduğu kimi ötürür, yol boyu hansı söz aralığının hansı sheet-ə düşdüyünü manifest-ə yazır."""
+    per_shard = words_per_shard(rows_per_shard)
+    for i, word in enumerate(words):
+        if i % per_shard == 0:
+            manifest.append({
+                'sheet': all_words_sheet_name(len(manifest) + 1),
+                'start': i, 'stop': i, 'first_word': word, 'last_word': word, 'rows': 0
+            })
+        entry = manifest[-1]
+        entry['stop'] = i + 1
+        entry['last_word'] = word
+        entry['rows'] += len(PARADIGM_SLOTS)
+        yield word
+    if not manifest:
+        manifest.append({
+            'sheet': all_words_sheet_name(1),
+            'start': 0, 'stop': 0, 'first_word': None, 'last_word': None, 'rows': 0
+        })
+
+def build_shard_manifest(words, rows_per_shard=EXCEL_MAX_ROWS - 1):
+    """Sözlər üçün Bütün_Sözlər hissələrinin siyahısını qaytarır (start/stop - giriş sözlərinin indeksləri)."""
+    manifest = []
+    for _ in track_shards(words, manifest, rows_per_shard):
+        pass
+    return manifest
+
+def write_all_words_shards(writer, df, manifest):
+    """Bütün_Sözlər DataFrame-ini manifest-ə görə ardıcıl sheet-lərə yazır."""
+    per_word = len(PARADIGM_SLOTS)
+    for entry in manifest:
+        part = df.iloc[entry['start'] * per_word:entry['stop'] * per_word]
+        write_sheet(writer, part, entry['sheet'])
+        set_column_widths(writer.sheets[entry['sheet']], part)
+
+def write_shard_manifest(manifest, manifest_file):
+    """Manifest-i JSON faylına yazır."""
+    with open(manifest_file, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+# ==================== ŞƏKİLÇİ İNDEKSİ ====================
+# İndeks generasiya zamanı (kök, şəkilçi) sütunlarından doldurulur:
+#   {'words': [söz blokları], 'size': söz sayı,
+#    'suffixes': {şəkilçi: {'count': forma sayı, 'slots': {slot: [söz mövqeləri]}, 'first': (mövqe, slot nömrəsi),
+#                           'example': ilk forma 'kök+şəkilçi'}}}
+def new_suffix_index():
+    return {'words': [], 'size': 0, 'suffixes': {}}
+
+def _add_suffix_positions(index, suffix, slot_no, positions, example):
+    entry = index['suffixes'].setdefault(suffix, {'count': 0, 'slots': {}, 'first': None, 'example': ''})
+    entry['count'] += len(positions)
+    entry['slots'].setdefault(PARADIGM_SLOTS[slot_no], []).append(positions)
+    first = (int(positions[0]), slot_no)
+    # Nümunə Bütün_Sözlər sırası ilə (söz, sonra slot) ilk rast gəlinən formadır
+    if entry['first'] is None or first < entry['first']:
+        entry['first'] = first
+        entry['example'] = example
+
+def update_suffix_index(index, words, columns):
+    """Bir söz blokunun hər slot üçün (kök massivi, şəkilçi massivi) cütlərini indeksə əlavə edir."""
+    words = pd.Series(words, dtype=object).to_numpy(dtype=object)
+    offset = index['size']
+    for slot_no, (stems, suffixes) in enumerate(columns):
+        suffixes = np.asarray(suffixes, dtype=object)
+        nonempty = np.flatnonzero(suffixes != '')
+        present = pd.Series(suffixes[nonempty])
+        for suffix, idx in present.groupby(present, sort=False).indices.items():
+            positions = nonempty[idx]
+            _add_suffix_positions(index, suffix, slot_no, positions + offset, f"{stems[positions[0]]}+{suffix}")
+    index['words'].append(words)
+    index['size'] += len(words)
+
+def merge_suffix_index(index, part):
+    """Başqa blokun (məs. işçi prosesin) indeksini bu indeksin sonuna birləşdirir."""
+    offset = index['size']
+    for suffix, entry in part['suffixes'].items():
+        for slot, arrays in entry['slots'].items():
+            slot_no = SLOT_INDEX[slot]
+            for positions in arrays:
+                example = entry['example'] if (int(positions[0]), slot_no) == entry['first'] else ''
+                _add_suffix_positions(index, suffix, slot_no, positions + offset, example)
+    index['words'].extend(part['words'])
+    index['size'] += part['size']
+
+def build_suffix_index(words):
+    """Sözlər üçün şəkilçi indeksini birbaşa qurur (görünüş cədvəli olmadan)."""
+    index = new_suffix_index()
+    words, columns = paradigm_arrays(words)
+    update_suffix_index(index, words, columns)
+    return index
+
+def suffix_index_words(index):
+    """İndeksin bütün sözləri (mövqe sırası ilə) tək massiv kimi."""
+    if len(index['words']) != 1:
+        index['words'] = [np.concatenate(index['words']) if index['words'] else np.empty(0, dtype=object)]
+    return index['words'][0]
+
+def _suffix_positions(entry, category=None, slot=None):
+    arrays = [
+        positions for (cat, key), parts in entry['slots'].items()
+        if category in (None, cat) and slot in (None, key)
+        for positions in parts
+    ]
+    return np.unique(np.concatenate(arrays)) if arrays else np.empty(0, dtype=int)
+
+def suffix_lemmas(index, suffix, category=None, slot=None):
+    """Şəkilçini qəbul edən sözlər (məs. suffix_lemmas(index, 'ımız')); kateqoriya/slot ilə süzülə bilər."""
+    entry = index['suffixes'].get(suffix)
+    if entry is None:
+        return []
+    return suffix_index_words(index)[_suffix_positions(entry, category, slot)].tolist()
+
+def suffix_stats(index):
+    """Şəkilçi tezlik cədvəli: forma sayı, söz sayı, slotlar və ilk nümunə (tezliyə görə azalan)."""
+    rows = [
+        (suffix, entry['count'], len(_suffix_positions(entry)),
+         ', '.join(f"{cat}/{key}" for cat, key in entry['slots']), entry['example'])
+        for suffix, entry in index['suffixes'].items()
+    ]
+    df = pd.DataFrame(rows, columns=['Şəkilçi', 'Forma sayı', 'Söz sayı', 'Slotlar', 'Nümunə'])
+    return df.sort_values(['Forma sayı', 'Şəkilçi'], ascending=[False, True], ignore_index=True)
+
+def suffix_examples_table_from_index(index):
+    """"Şəkilçilər və Nümunələr" cədvəlini indeksdən qurur (Bütün_Sözlər-i yenidən oxumadan)."""
+    suffix_dict = {suffix: entry['example'] for suffix, entry in index['suffixes'].items()}
+    for suffix in CODE_SUFFIXES:
+        suffix_dict.setdefault(suffix, '')
+    return pd.DataFrame(sorted(suffix_dict.items(), key=lambda x: x[0]), columns=["Şəkilçi", "Nümunə"])
+
+def export_suffix_index(index, output_file):
+    """İndeksi JSON faylına yazır: şəkilçi -> say, nümunə, slotlar üzrə say və sözlər."""
+    words = suffix_index_words(index)
+    data = {
+        suffix: {
+            'count': entry['count'],
+            'example': entry['example'],
+            'slots': {f"{cat}/{key}": sum(len(p) for p in parts) for (cat, key), parts in entry['slots'].items()},
+            'words': words[_suffix_positions(entry)].tolist()
+        }
+        for suffix, entry in sorted(index['suffixes'].items())
+    }
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    print(f"✅ Şəkilçi indeksi '{output_file}' faylına yazıldı")
 
 # ==================== ŞƏKİLÇİLƏR VƏ NÜMUNƏLƏRİNİ ÇIXARAN FUNKSİYA ====================
-def extract_unique_suffixes_and_examples_with_code_suffixes(file_path, output_path):
-    wb = load_workbook(file_path)
-    ws = wb['Bütün_Sözlər']
+CODE_SUFFIXES = [
+    'lar', 'lər', 'ın', 'in', 'a', 'ə', 'ı', 'i', 'da', 'də', 'dan', 'dən',
+    'm', 'n', 'sı', 'si', 'su', 'sü', 'ım', 'im', 'um', 'üm',
+    'ımız', 'imiz', 'umuz', 'ümüz', 'ınız', 'iniz', 'unuz', 'ünüz',
+    'ları', 'ləri',
+    'yam', 'yəm', 'san', 'sən', 'dır', 'dir', 'dur', 'dür',
+    'ıq', 'ik', 'uq', 'ük', 'sınız', 'siniz', 'sunuz', 'sünüz',
+    'dırlar', 'dirlər', 'durlar', 'dürlər'
+]
 
+def build_suffix_examples_table(values):
+    """Bütün_Sözlər dəyərlərindən və CODE_SUFFIXES-dən "Şəkilçilər və Nümunələr" cədvəlini qurur."""
     suffix_dict = {}
 
-    # 1. Bütün_Sözlər sheet-indən şəkilçiləri çıxart
-    for row in ws.iter_rows(min_row=2, values_only=True):
-        cell = row[0]
+    # 1. Bütün_Sözlər dəyərlərindən şəkilçiləri çıxart
+    for cell in values:
         if cell and '+' in cell:
             parts = str(cell).split('+')
             if len(parts) == 2:
@@ -262,22 +1249,28 @@ def extract_unique_suffixes_and_examples_with_code_suffixes(file_path, output_pa
                     suffix_dict[suffix] = cell  # ilk nümunə
 
     # 2. Koddan şəkilçilər əlavə et
-    CODE_SUFFIXES = [
-        'lar', 'lər', 'ın', 'in', 'a', 'ə', 'ı', 'i', 'da', 'də', 'dan', 'dən',
-        'm', 'n', 'sı', 'si', 'su', 'sü', 'ım', 'im', 'um', 'üm',
-        'ımız', 'imiz', 'umuz', 'ümüz', 'ınız', 'iniz', 'unuz', 'ünüz',
-        'ları', 'ləri',
-        'yam', 'yəm', 'san', 'sən', 'dır', 'dir', 'dur', 'dür',
-        'ıq', 'ik', 'uq', 'ük', 'sınız', 'siniz', 'sunuz', 'sünüz',
-        'dırlar', 'dirlər', 'durlar', 'dürlər'
-    ]
     for suffix in CODE_SUFFIXES:
         if suffix not in suffix_dict:
             suffix_dict[suffix] = ''
     sorted_suffixes = sorted(suffix_dict.items(), key=lambda x: x[0])
-    df = pd.DataFrame(sorted_suffixes, columns=["Şəkilçi", "Nümunə"])
-    with pd.ExcelWriter(output_path, engine='openpyxl', mode='a', if_sheet_exists='replace') as writer:
-        df.to_excel(writer, sheet_name="Şəkilçilər və Nümunələr", index=False)
+    return pd.DataFrame(sorted_suffixes, columns=["Şəkilçi", "Nümunə"])
+
+@instrumented('extract_unique_suffixes_and_examples_with_code_suffixes')
+def extract_unique_suffixes_and_examples_with_code_suffixes(file_path, output_path, suffix_index=None):
+    """Şəkilçilər sheet-ini yazır; process_words-un doldurduğu suffix_index verilibsə iş kitabı yenidən oxunmur."""
+    if suffix_index is not None:
+        df = suffix_examples_table_from_index(suffix_index)
+    else:
+        with stage('read_workbook'):
+            wb = load_workbook(file_path, read_only=True)
+            # Bütün_Sözlər hissələrə bölünübsə, bütün hissələr (Bütün_Sözlər_2, _3, ...) oxunur
+            shards = [ws for ws in wb.worksheets if ws.title == 'Bütün_Sözlər' or ws.title.startswith('Bütün_Sözlər_')]
+            df = build_suffix_examples_table(
+                row[0] for ws in shards for row in ws.iter_rows(min_row=2, values_only=True)
+            )
+            wb.close()
+    with excel_writer(output_path, mode='a', if_sheet_exists='replace') as writer:
+        write_sheet(writer, df, "Şəkilçilər və Nümunələr")
    # print("✅ Kodda olan və Excel-də olmayan şəkilçilər də əlavə olundu!")
 
 # ==================== İSİMLƏR SHEETİNİ YARAT VƏ QURUPLAŞDIRDIQ ====================
@@ -319,10 +1312,7 @@ def add_grouped_headers_to_isimler_sheet(file_path):
         ws.merge_cells(start_row=1, start_column=xeb_idx[0], end_row=1, end_column=xeb_idx[-1])
 
     for col in hal_idx + mens_idx + xeb_idx:
-        cell = ws.cell(row=1, column=col)
-        cell.alignment = Alignment(horizontal='center', vertical='center')
-        cell.font = Font(bold=True)
-        cell.fill = PatternFill(start_color="BDD7EE", end_color="BDD7EE", fill_type="solid")
+        style_header_cell(ws.cell(row=1, column=col), "BDD7EE")
 
     wb.save(file_path)
    # print("✅ İsimlər sheet-inə qruplaşdırılmış başlıqlar əlavə olundu!")
@@ -344,27 +1334,18 @@ def color_grouped_headers_in_isimler(file_path):
     ]
     xeberlik_headers = ['mən', 'sən', 'o', 'biz', 'siz', 'onlar']
 
+    merged = merged_ranges_by_start(ws)
     for col in range(1, ws.max_column + 1):
         val1 = ws.cell(row=1, column=col).value
         val2 = ws.cell(row=2, column=col).value
         # Qrup başlıqları üçün
         if val1 in colors:
-            merged_range = None
-            for m in ws.merged_cells.ranges:
-                if m.min_col == col and m.min_row == 1:
-                    merged_range = m
-                    break
+            merged_range = merged.get((1, col))
             if merged_range:
                 for c in range(merged_range.min_col, merged_range.max_col + 1):
-                    cell = ws.cell(row=1, column=c)
-                    cell.fill = PatternFill(start_color=colors[val1], end_color=colors[val1], fill_type="solid")
-                    cell.font = Font(bold=True)
-                    cell.alignment = Alignment(horizontal='center', vertical='center')
+                    style_header_cell(ws.cell(row=1, column=c), colors[val1])
             else:
-                cell = ws.cell(row=1, column=col)
-                cell.fill = PatternFill(start_color=colors[val1], end_color=colors[val1], fill_type="solid")
-                cell.font = Font(bold=True)
-                cell.alignment = Alignment(horizontal='center', vertical='center')
+                style_header_cell(ws.cell(row=1, column=col), colors[val1])
         # Alt başlıqlar üçün
         if val2 in hal_headers:
             color = colors['Hal_Şəkilçiləri']
@@ -375,16 +1356,17 @@ def color_grouped_headers_in_isimler(file_path):
         else:
             color = None
         if color:
-            cell = ws.cell(row=2, column=col)
-            cell.fill = PatternFill(start_color=color, end_color=color, fill_type="solid")
-            cell.font = Font(bold=True)
-            cell.alignment = Alignment(horizontal='center', vertical='center')
+            style_header_cell(ws.cell(row=2, column=col), color)
 
     wb.save(file_path)
    # print("✅ İsimlər sheet-ində başlıqlar rəngləndi və səliqəyə salındı.")
 
 def color_multiindex_headers(ws):
     """MultiIndex başlıqlarına və alt başlıqlara rəngli fon verir."""
+    with stage('styling'):
+        _color_multiindex_headers(ws)
+
+def _color_multiindex_headers(ws):
     # Qrup başlıqları üçün rənglər
     group_colors = {
         'Hal_Şəkilçiləri': 'FFD966',        # Sarı
@@ -403,10 +1385,7 @@ def color_multiindex_headers(ws):
     for col in range(1, ws.max_column + 1):
         val = ws.cell(row=1, column=col).value
         if val in group_colors:
-            cell = ws.cell(row=1, column=col)
-            cell.fill = PatternFill(start_color=group_colors[val], end_color=group_colors[val], fill_type="solid")
-            cell.font = Font(bold=True)
-            cell.alignment = Alignment(horizontal='center', vertical='center')
+            style_header_cell(ws.cell(row=1, column=col), group_colors[val])
 
     # 2-ci sətr: Alt başlıqlar
     for col in range(1, ws.max_column + 1):
@@ -419,16 +1398,30 @@ def color_multiindex_headers(ws):
             color = group_colors['Xəbərlik_Şəkilçiləri']
         else:
             color = None
-        cell = ws.cell(row=2, column=col)
-        if color:
-            cell.fill = PatternFill(start_color=color, end_color=color, fill_type="solid")
-        cell.font = Font(bold=True)
-        cell.alignment = Alignment(horizontal='center', vertical='center')
+        style_header_cell(ws.cell(row=2, column=col), color)
 
+@instrumented('create_isimler_sheet_with_grouped_headers')
 def create_isimler_sheet_with_grouped_headers(output_file):
-    df_hal = pd.read_excel(output_file, sheet_name="Hal_Şəkilçiləri")
-    df_mens = pd.read_excel(output_file, sheet_name="Mənsubiyyət_Şəkilçiləri")
-    df_xeb = pd.read_excel(output_file, sheet_name="Xəbərlik_Şəkilçiləri")
+    with stage('read_sheets'):
+        df_hal = pd.read_excel(output_file, sheet_name="Hal_Şəkilçiləri")
+        df_mens = pd.read_excel(output_file, sheet_name="Mənsubiyyət_Şəkilçiləri")
+        df_xeb = pd.read_excel(output_file, sheet_name="Xəbərlik_Şəkilçiləri")
+    df = build_isimler_table(df_hal, df_mens, df_xeb)
+
+    write_multiindex_to_excel(df, output_file, "İsimlər")
+
+    with stage('load_workbook'):
+        wb = load_workbook(output_file)
+    remove_sheets(wb, ["Hal_Şəkilçiləri", "Mənsubiyyət_Şəkilçiləri", "Xəbərlik_Şəkilçiləri"])
+    save_workbook(wb, output_file)
+
+    ws = wb["İsimlər"]
+    set_column_width_and_wrap(ws, df=df, index=True)
+    color_multiindex_headers(ws)  # <-- Rəngləmə funksiyasını çağırın
+    save_workbook(wb, output_file)
+
+def build_isimler_table(df_hal, df_mens, df_xeb):
+    """Hal, Mənsubiyyət və Xəbərlik cədvəllərini qruplaşdırılmış (MultiIndex) başlıqlı bir cədvəldə birləşdirir."""
     base_cols = ['Söz']
 
     hal_cols = ['Adlıq', 'Yiyəlik', 'Yönlük', 'Təsirlik', 'Yerlik', 'Çıxışlıq']
@@ -451,31 +1444,732 @@ def create_isimler_sheet_with_grouped_headers(output_file):
         ['Söz'] + hal_cols + mens_cols + xeb_cols
     ]
     df.columns = pd.MultiIndex.from_arrays(arrays)
+    return df
 
-    write_multiindex_to_excel(df, output_file, "İsimlər")
+# ==================== BÜTÖV İŞ KİTABINI BİR KEÇİDDƏ YAZAN FUNKSİYA ====================
+@instrumented('build_workbook')
+def build_workbook(words, output_file, suffixes_file=None, rows_per_shard=EXCEL_MAX_ROWS - 1, manifest_file=None,
+                   workers=1, route_pos=None, normalize=True, row_map=False, suffix_index_file=None, pos_labels=None):
+    """Bütün sheet-ləri yaddaşda qurur və faylı bir dəfə yazır (nəticə process_words zənciri ilə eynidir)."""
+    words, report_sheets = _prepare_words(words, normalize, route_pos, pos_labels)
+    if not row_map:
+        report_sheets.pop(ROW_MAP_SHEET, None)
 
-    wb = load_workbook(output_file)
-    remove_sheets(wb, ["Hal_Şəkilçiləri", "Mənsubiyyət_Şəkilçiləri", "Xəbərlik_Şəkilçiləri"])
-    wb.save(output_file)
+    suffix_examples = {}
+    if suffixes_file:
+        suffix_examples = read_suffix_examples_from_excel(suffixes_file)
 
-    ws = wb["İsimlər"]
-    set_column_width_and_wrap(ws)
-    color_multiindex_headers(ws)  # <-- Rəngləmə funksiyasını çağırın
-    wb.save(output_file)
+    suffix_index = new_suffix_index()
+    with stage('generation'):
+        results = build_result_sheets(build_display_table_parallel(
+            words, suffix_examples, workers, suffix_index=suffix_index
+        ))
+    with stage('suffix_table'):
+        suffixes = suffix_examples_table_from_index(suffix_index)
+    with stage('isimler_table'):
+        isimler = build_isimler_table(
+            results['Hal_Şəkilçiləri'], results['Mənsubiyyət_Şəkilçiləri'], results['Xəbərlik_Şəkilçiləri']
+        )
+    manifest = build_shard_manifest(results['Cəm_Formaları']['Söz'], rows_per_shard)
+    count('words', len(isimler))
+    count('forms', len(isimler) * len(PARADIGM_SLOTS))
 
-# ==================== QALAN FUNKSİYALAR EYNİ QALIR ====================
-def set_column_width_and_wrap(ws, min_width=12, max_width=40):
-    """Sütun enini və wrap_text-i tənzimləyir."""
+    with excel_writer(output_file) as writer:
+        write_all_words_shards(writer, results['Bütün_Sözlər'], manifest)
+        write_sheet(writer, results['Cəm_Formaları'], 'Cəm_Formaları')
+        set_column_widths(writer.sheets['Cəm_Formaları'], results['Cəm_Formaları'])
+        for sheet, df in report_sheets.items():
+            write_sheet(writer, df, sheet)
+            set_column_widths(writer.sheets[sheet], df)
+        write_sheet(writer, suffixes, "Şəkilçilər və Nümunələr")
+        write_sheet(writer, isimler, "İsimlər", index=True)
+        ws = writer.sheets["İsimlər"]
+        set_column_width_and_wrap(ws, df=isimler, index=True)
+        color_multiindex_headers(ws)
+    if manifest_file:
+        write_shard_manifest(manifest, manifest_file)
+    if suffix_index_file:
+        export_suffix_index(suffix_index, suffix_index_file)
+    print(f"✅ Excel faylı '{output_file}' uğurla yaradıldı!")
+    return manifest
+
+# ==================== İNKREMENTAL REJİM (GÜNLÜK DELTA) ====================
+# Hər iş yalnız əvvəlki işlərdə yazılmamış sözləri yeni hissə iş kitabına yazır, ona görə nəticə bir tam iş
+# kitabı deyil, N hissə iş kitabıdır (part_0001.xlsx, part_0002.xlsx, ...):
+#   <qovluq>/delta_manifest.json       - {'rules_version': ..., 'parts': [{'file', 'words_file', 'words', ...}],
+#                                         'removed': [{'word', 'file'}, ...]}
+#   <qovluq>/part_0001.xlsx, part_0001.txt - hissənin iş kitabı (build_workbook) və onun sözləri (sətir-sətir)
+# Girişdən çıxarılmış, düzəldilmiş və ya etiketi dəyişib isim paradiqmasından çıxmış sözlər köhnə hissələrdə
+# qalır; 'removed' onları və olduqları hissəni sadalayır. Cari leksikon = hissələrin sözləri - 'removed'.
+# Manifest sonda atomik yazılır, ona görə yarımçıq qalmış iş növbəti işdə yenidən yazılır. Qaydalar dəyişəndə
+# yeni hissələr köhnələrdən sonrakı nömrə ilə yazılır, köhnələr isə yalnız yeni manifest yazılandan sonra silinir.
+DELTA_MANIFEST = 'delta_manifest.json'
+
+def rules_version(suffix_examples=None):
+    """Qayda cədvəllərinin, SPECIAL_WORDS-un və şəkilçi nümunələrinin heş-i; dəyişəndə hissələr yenidən yazılır."""
+    payload = json.dumps([
+        PARADIGM_SLOTS,
+        sorted([str(cls), row] for cls, row in PARADIGM_TABLES.items()),
+        SPECIAL_WORDS,
+        sorted((suffix_examples or {}).items())
+    ], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def read_delta_manifest(output_dir, version):
+    """Qovluğun manifest-i; qaydaların versiyası fərqlidirsə boş manifest, köhnə hissələr 'stale_parts'-da."""
+    manifest_file = os.path.join(output_dir, DELTA_MANIFEST)
+    try:
+        with open(manifest_file, encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = None
+    if isinstance(manifest, dict) and manifest.get('rules_version') == version:
+        return manifest
+    stale_parts = manifest.get('parts', []) if isinstance(manifest, dict) else []
+    if stale_parts:
+        print("♻️ Qaydalar dəyişib: bütün sözlər yenidən yazılır")
+    return {'rules_version': version, 'parts': [], 'removed': [], 'stale_parts': stale_parts}
+
+def _remove_delta_parts(output_dir, parts):
+    for part in parts:
+        for name in (part.get('file'), part.get('words_file')):
+            if name and os.path.exists(os.path.join(output_dir, name)):
+                os.remove(os.path.join(output_dir, name))
+
+def _delta_part_number(part):
+    return int(os.path.splitext(part['file'])[0].rsplit('_', 1)[-1])
+
+def delta_known_words(output_dir, manifest):
+    """Manifest-dəki hissələrə artıq yazılmış sözlər: {söz: hissənin iş kitabı}."""
+    known = {}
+    for part in manifest['parts']:
+        with open(os.path.join(output_dir, part['words_file']), encoding='utf-8') as f:
+            for line in f:
+                known.setdefault(line.rstrip('\n'), part['file'])
+    return known
+
+@instrumented('build_delta_workbook')
+def build_delta_workbook(words, output_dir, suffixes_file=None, rows_per_shard=EXCEL_MAX_ROWS - 1, workers=1,
+                         route_pos=None, normalize=True, pos_labels=None):
+    """Yalnız yeni sözlər üçün output_dir-ə növbəti hissə iş kitabını yazır; qovluğun manifest-ini qaytarır."""
+    os.makedirs(output_dir, exist_ok=True)
+    words, _ = _prepare_words(words, normalize, route_pos, pos_labels)
+    # Oxunmayan suffixes_file rules_version-u dəyişib bütün hissələri sildirməsin
+    suffix_examples = read_suffix_examples_from_excel(suffixes_file, strict=True) if suffixes_file else {}
+    manifest = read_delta_manifest(output_dir, rules_version(suffix_examples))
+    stale_parts = manifest.pop('stale_parts', [])
+    with stage('delta'):
+        known = delta_known_words(output_dir, manifest)
+        new_words = words[~words.isin(list(known))].drop_duplicates()
+        current = set(words)
+        removed = [{'word': word, 'file': part_file} for word, part_file in known.items() if word not in current]
+    count('known_words', len(words) - len(new_words))
+    count('removed_words', len(removed))
+    manifest_changed = removed != manifest.get('removed', []) or bool(stale_parts)
+    manifest['removed'] = removed
+    if new_words.empty:
+        if manifest_changed:
+            _replace_json_file(os.path.join(output_dir, DELTA_MANIFEST), manifest)
+            _remove_delta_parts(output_dir, stale_parts)
+        print(f"✅ Yeni söz yoxdur: '{output_dir}' hissələri dəyişmədi, {len(removed)} söz girişdən çıxıb")
+        return manifest
+
+    name = f"part_{max(map(_delta_part_number, manifest['parts'] + stale_parts), default=0) + 1:04d}"
+    build_workbook(new_words, os.path.join(output_dir, name + '.xlsx'), suffixes_file, rows_per_shard,
+                   workers=workers, route_pos=False, normalize=False)
+    with open(os.path.join(output_dir, name + '.txt'), 'w', encoding='utf-8') as f:
+        f.writelines(word + '\n' for word in new_words)
+    manifest['parts'].append({
+        'file': name + '.xlsx', 'words_file': name + '.txt', 'words': len(new_words),
+        'first_word': new_words.iloc[0], 'last_word': new_words.iloc[-1]
+    })
+    _replace_json_file(os.path.join(output_dir, DELTA_MANIFEST), manifest)
+    _remove_delta_parts(output_dir, stale_parts)
+    print(f"✅ '{output_dir}': {len(new_words)} yeni söz, {len(words) - len(new_words)} söz əvvəlki hissələrdədir, "
+          f"{len(removed)} söz girişdən çıxıb")
+    return manifest
+
+# ==================== AXINLI (STREAMING) YAZMA REJİMİ ====================
+def iter_input_words(input_file, column='Söz', blank='nan', label_column=None):
+    """Giriş faylının ilk sheet-indən sözləri (label_column ilə (söz, etiket) cütlərini) read-only rejimdə oxuyur."""
+    wb = load_workbook(input_file, read_only=True)
+    try:
+        rows = wb.worksheets[0].iter_rows(values_only=True)
+        header = list(next(rows, ()))
+        idx = header.index(column)
+        label_idx = header.index(label_column) if label_column is not None and label_column in header else None
+        pending_blank = 0
+        for row in rows:
+            if all(v is None for v in row):
+                pending_blank += 1
+                continue
+            for _ in range(pending_blank):
+                yield blank if label_column is None else (blank, None)
+            pending_blank = 0
+            value = row[idx] if idx < len(row) else None
+            value = blank if value is None else str(value)
+            if label_column is None:
+                yield value
+            else:
+                yield value, (row[label_idx] if label_idx is not None and label_idx < len(row) else None)
+    finally:
+        wb.close()
+
+def input_columns(input_file):
+    """Giriş faylının ilk sheet-inin başlıq sətri (yalnız birinci sətir oxunur)."""
+    wb = load_workbook(input_file, read_only=True)
+    try:
+        return list(next(wb.worksheets[0].iter_rows(max_row=1, values_only=True), ()))
+    finally:
+        wb.close()
+
+def iter_paradigm_rows(words, suffix_examples=None):
+    """Hər söz üçün {sheet: [sətirlər]} verən generator (process_words sheet-ləri ilə eyni quruluş)."""
+    suffix_examples = suffix_examples or {}
+    for word in words:
+        display = {'Söz': word}
+        for record in paradigm_records(word):
+            display[record.slot] = format_record(record, suffix_examples)
+        rows = {'Bütün_Sözlər': [[display[key]] for _, key in PARADIGM_SLOTS]}
+        for sheet, columns in RESULT_SHEET_COLUMNS.items():
+            rows[sheet] = [[display[c] for c in columns]]
+        yield rows
+
+def _result_sheet_headers():
+    headers = {'Bütün_Sözlər': ['Yeni Söz']}
+    headers.update(RESULT_SHEET_COLUMNS)
+    return headers
+
+@instrumented('stream_process_words')
+def stream_process_words(input_file, output_file, suffixes_file=None, rows_per_shard=EXCEL_MAX_ROWS - 1, manifest_file=None,
+                         route_pos=None, normalize=True, row_map=False, dedupe=True):
+    """process_words-un sabit yaddaşlı variantı: giriş iki keçiddə (enlər, sətirlər) oxunub write-only iş kitabına yazılır.
+
+    dedupe=False - təkrar lemmalar atılmır və yaddaş unikal lemmaların sayı ilə artmır.
+    """
+    suffix_examples = {}
+    if suffixes_file:
+        suffix_examples = read_suffix_examples_from_excel(suffixes_file)
+    # Etiketlər sözlərlə eyni keçiddə oxunur və sətir-sətir yönləndirilir (ayrıca keçid və lüğət yoxdur)
+    routing = bool(route_pos) or (route_pos is None and POS_INPUT_COLUMN in input_columns(input_file))
+    label_column = POS_INPUT_COLUMN if routing else None
+    headers = _result_sheet_headers()
+    per_shard = words_per_shard(rows_per_shard)
+
+    def target_sheet(sheet, word_no):
+        return all_words_sheet_name(word_no // per_shard + 1) if sheet == 'Bütün_Sözlər' else sheet
+
+    def input_words(on_word=None, on_row=None):
+        if normalize:
+            rows = iter_input_words(input_file, blank=None, label_column=label_column)
+            words = iter_normalized_words(rows, on_row, labelled=routing, dedupe=dedupe)
+        else:
+            words = iter_input_words(input_file, label_column=label_column)
+        return iter_routed_words(words, on_word, guess=route_pos is True) if routing else words
+
+    def track_row_map_widths(row_no, value, word):
+        for i, text in enumerate((str(row_no), '' if value is None else str(value), word)):
+            row_map_widths[i] = max(row_map_widths[i], len(text))
+        count('input_rows')
+        if not word:
+            count('dropped_rows')
+
+    def track_pos_widths(word, pos):
+        pos_widths[0] = max(pos_widths[0], len(word))
+        pos_widths[1] = max(pos_widths[1], len(pos))
+        if pos not in PARADIGM_POS:
+            count('skipped_words')
+
+    # 1-ci keçid: hər sütun üçün ən uzun dəyər və hissələrin manifest-i
+    manifest = []
+    pos_widths = [len(h) for h in POS_SHEET_COLUMNS]
+    row_map_widths = [len(h) for h in ROW_MAP_COLUMNS]
+    words = track_shards(input_words(track_pos_widths, track_row_map_widths), manifest, rows_per_shard)
+    widths = {sheet: [len(h) for h in cols] for sheet, cols in headers.items()}
+    with stage('width_scan'):
+        for word_no, rows in enumerate(iter_paradigm_rows(words, suffix_examples)):
+            for sheet, sheet_rows in rows.items():
+                sheet = target_sheet(sheet, word_no)
+                if sheet not in widths:
+                    widths[sheet] = [len(h) for h in headers['Bütün_Sözlər']]
+                sheet_widths = widths[sheet]
+                for row in sheet_rows:
+                    for i, value in enumerate(row):
+                        if len(value) > sheet_widths[i]:
+                            sheet_widths[i] = len(value)
+    n_words = manifest[-1]['stop'] if manifest else 0
+    count('words', n_words)
+    count('forms', n_words * len(PARADIGM_SLOTS))
+
+    # 2-ci keçid: sətirləri birbaşa yazma
+    wb = Workbook(write_only=True)
+    sheets = {}
+    sheet_order = [entry['sheet'] for entry in manifest] + list(RESULT_SHEET_COLUMNS)
+    if routing:
+        headers[POS_SHEET] = POS_SHEET_COLUMNS
+        widths[POS_SHEET] = pos_widths
+        sheet_order.append(POS_SHEET)
+    if normalize and row_map:
+        headers[ROW_MAP_SHEET] = ROW_MAP_COLUMNS
+        widths[ROW_MAP_SHEET] = row_map_widths
+        sheet_order.append(ROW_MAP_SHEET)
+    for sheet in sheet_order:
+        cols = headers.get(sheet, headers['Bütün_Sözlər'])
+        ws = wb.create_sheet(sheet)
+        for i, width in enumerate(widths[sheet], 1):
+            ws.column_dimensions[get_column_letter(i)].width = width + 2
+        ws.append(cols)
+        sheets[sheet] = ws
+    def write_pos_row(word, pos):
+        sheets[POS_SHEET].append([word, pos])
+        count('rows')
+
+    def write_row_map_row(row_no, value, word):
+        if row_map:
+            sheets[ROW_MAP_SHEET].append([row_no, '' if value is None else value, word])
+            count('rows')
+
+    with stage('excel_write'):
+        for word_no, rows in enumerate(iter_paradigm_rows(input_words(write_pos_row, write_row_map_row), suffix_examples)):
+            for sheet, sheet_rows in rows.items():
+                ws = sheets[target_sheet(sheet, word_no)]
+                for row in sheet_rows:
+                    ws.append(row)
+                count('rows', len(sheet_rows))
+    count('sheets', len(sheets))
+    save_workbook(wb, output_file)
+    if manifest_file:
+        write_shard_manifest(manifest, manifest_file)
+    print(f"✅ Excel faylı '{output_file}' uğurla yaradıldı!")
+    return manifest
+
+# ==================== DİGƏR ÇIXIŞ FORMATLARI (CSV / JSONL / PARQUET) ====================
+FORM_RECORD_COLUMNS = ['Söz', 'Kateqoriya', 'Slot', 'Forma', 'Şəkilçi']
+
+def iter_paradigm_records(words):
+    """Hər söz üçün (söz, [(kateqoriya, slot, forma, şəkilçi), ...]) qaytaran generator."""
+    for word in words:
+        yield word, [(r.category, r.slot, r.form, r.suffix) for r in paradigm_records(word)]
+
+def iter_form_records(words):
+    """Hər forma üçün (söz, kateqoriya, slot, forma, şəkilçi) qaytaran generator."""
+    for word, records in iter_paradigm_records(words):
+        for record in records:
+            yield (word,) + record
+
+def export_csv(words, output_file, suffixes_file=None, normalize=True, route_pos=None, pos_labels=None):
+    """Formaları uzun formatda (bir sətir - bir forma) CSV-yə axınla yazır; giriş build_workbook-dakı kimi hazırlanır.
+
+    suffixes_file verilibsə "Nümunə" sütunu əlavə olunur.
+    """
+    words, _ = _prepare_words(words, normalize, route_pos, pos_labels)
+    suffix_examples = read_suffix_examples_from_excel(suffixes_file) if suffixes_file else {}
+    with open(output_file, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        if suffix_examples:
+            writer.writerow(FORM_RECORD_COLUMNS + ['Nümunə'])
+            writer.writerows(row + (suffix_examples.get(row[-1], ''),) for row in iter_form_records(words))
+        else:
+            writer.writerow(FORM_RECORD_COLUMNS)
+            writer.writerows(iter_form_records(words))
+    print(f"✅ CSV faylı '{output_file}' uğurla yaradıldı!")
+
+def _form_entry(category, slot, form, suffix, suffix_examples=None):
+    """JSON sənədindəki bir forma; şəkilçinin nümunəsi varsa "Nümunə" əlavə olunur."""
+    entry = dict(zip(FORM_RECORD_COLUMNS[1:], (category, slot, form, suffix)))
+    example = suffix_examples.get(suffix) if suffix_examples and suffix else None
+    if example:
+        entry['Nümunə'] = example
+    return entry
+
+def paradigm_document(word, suffix_examples=None):
+    """Bir sözün JSON sənədi: {"Söz": ..., "formalar": [...]}; şəkilçinin nümunəsi varsa "Nümunə" əlavə olunur."""
+    forms = [_form_entry(r.category, r.slot, r.form, r.suffix, suffix_examples) for r in paradigm_records(word)]
+    return {'Söz': word, 'formalar': forms}
+
+def export_jsonl(words, output_file, suffixes_file=None, normalize=True, route_pos=None, pos_labels=None):
+    """Hər söz üçün bir JSON sətri yazır: {"Söz": ..., "formalar": [...]}; giriş build_workbook-dakı kimi hazırlanır."""
+    words, _ = _prepare_words(words, normalize, route_pos, pos_labels)
+    suffix_examples = read_suffix_examples_from_excel(suffixes_file) if suffixes_file else {}
+    with open(output_file, 'w', encoding='utf-8') as f:
+        for word in words:
+            f.write(json.dumps(paradigm_document(word, suffix_examples), ensure_ascii=False) + '\n')
+    print(f"✅ JSONL faylı '{output_file}' uğurla yaradıldı!")
+
+def build_forms_long_table(words, suffix_examples=None):
+    """Sözlərin formalarını uzun formatda (FORM_RECORD_COLUMNS) qaytarır; sıra söz, sonra slot üzrədir.
+
+    suffix_examples verilibsə "Nümunə" sütunu əlavə olunur.
+    """
+    words, columns = paradigm_arrays(words)
+    n = len(words)
+    forms = np.empty((n, len(PARADIGM_SLOTS)), dtype=object)
+    suffixes = np.empty((n, len(PARADIGM_SLOTS)), dtype=object)
+    for i, (stems, slot_suffixes) in enumerate(columns):
+        forms[:, i] = stems + slot_suffixes
+        suffixes[:, i] = slot_suffixes
+    table = pd.DataFrame({
+        'Söz': np.repeat(words.to_numpy(dtype=object), len(PARADIGM_SLOTS)),
+        'Kateqoriya': np.tile([cat for cat, _ in PARADIGM_SLOTS], n),
+        'Slot': np.tile([key for _, key in PARADIGM_SLOTS], n),
+        'Forma': forms.ravel(),
+        'Şəkilçi': suffixes.ravel()
+    })
+    if suffix_examples:
+        table['Nümunə'] = table['Şəkilçi'].map(suffix_examples).fillna('')
+    return table
+
+def _sibling_path(path, tag):
+    root, ext = os.path.splitext(path)
+    return f"{root}_{tag}{ext}"
+
+def export_columnar(words, output_file, fmt='parquet', suffixes_file=None, normalize=True, route_pos=None,
+                    pos_labels=None):
+    """Geniş və uzun ('<ad>_formalar.<uzantı>') forma cədvəllərini Parquet və ya Arrow faylına yazır (pyarrow lazımdır)."""
+    words, _ = _prepare_words(words, normalize, route_pos, pos_labels)
+    suffix_examples = read_suffix_examples_from_excel(suffixes_file) if suffixes_file else {}
+    table = generate_paradigms(words)
+    long_table = build_forms_long_table(words, suffix_examples)
+    long_file = _sibling_path(output_file, 'formalar')
+    if fmt == 'parquet':
+        table.to_parquet(output_file, index=False)
+        long_table.to_parquet(long_file, index=False)
+    else:
+        table.reset_index(drop=True).to_feather(output_file)
+        long_table.to_feather(long_file)
+    print(f"✅ '{output_file}' və '{long_file}' faylları uğurla yaradıldı!")
+
+def export_parquet(words, output_file, **options):
+    export_columnar(words, output_file, 'parquet', **options)
+
+def export_feather(words, output_file, **options):
+    export_columnar(words, output_file, 'feather', **options)
+
+# Format -> (fayl uzantıları, funksiya). Hər funksiya (words, output_file, suffixes_file=, normalize=, route_pos=,
+# pos_labels=) qəbul edir; build_workbook-un qalan parametrləri (workers, row_map, ...) yalnız xlsx üçündür.
+EXPORT_BACKENDS = {
+    'xlsx': (('.xlsx',), build_workbook),
+    'csv': (('.csv',), export_csv),
+    'jsonl': (('.jsonl',), export_jsonl),
+    'parquet': (('.parquet',), export_parquet),
+    'feather': (('.feather', '.arrow'), export_feather),
+}
+
+def export_format(output_file):
+    """Fayl uzantısına uyğun EXPORT_BACKENDS formatı; uzantı tanınmırsa None."""
+    ext = os.path.splitext(output_file)[1].lower()
+    return next((name for name, (exts, _) in EXPORT_BACKENDS.items() if ext in exts), None)
+
+def export_paradigms(words, output_file, fmt=None, **options):
+    """Paradiqmaları seçilmiş formatda yazır; fmt verilməyibsə fayl uzantısından təyin olunur.
+
+    suffixes_file, normalize, route_pos və pos_labels bütün formatlar üçün eynidir; qalan options yalnız xlsx
+    (build_workbook) üçündür.
+    """
+    if fmt is None:
+        fmt = export_format(output_file)
+    if fmt not in EXPORT_BACKENDS:
+        raise ValueError(f"Naməlum çıxış formatı: {fmt} (mümkün: {', '.join(EXPORT_BACKENDS)})")
+    return EXPORT_BACKENDS[fmt][1](words, output_file, **options)
+
+# ==================== FORMATLAMA ====================
+def _text_lengths(values):
+    """Excel xanasında görünəcək mətnin uzunluğu (boş, NaN və yalançı dəyərlər 0), vektorlaşdırılmış."""
+    s = pd.Series(values, dtype=object)
+    return s.where(s.notna() & s.astype(bool), '').astype(str).str.len()
+
+def _max_text_length(values):
+    return int(_text_lengths(values).max()) if len(values) else 0
+
+def frame_text_widths(df, index=False):
+    """df.to_excel-in yazacağı hər sütunun ən uzun mətn uzunluğu (başlıq sətirləri daxil)."""
+    columns = df.columns
+    levels = columns.nlevels
+    widths = []
+    if index:
+        # İndeks sütunu: başlıq hissəsində sütun/indeks adları, sonra indeks dəyərləri
+        names = list(columns.names) + list(df.index.names) if levels > 1 else list(df.index.names)
+        widths.append(max(_max_text_length(names), _max_text_length(df.index.to_numpy(dtype=object))))
+    labels = [columns.get_level_values(level) for level in range(levels)]
+    for i in range(len(columns)):
+        header = []
+        for level, values in enumerate(labels):
+            # Birləşdirilmiş (merge) yuxarı səviyyə başlığı yalnız öz aralığının ilk sütununa yazılır
+            if level == levels - 1 or i == 0 or values[i] != values[i - 1]:
+                header.append(values[i])
+        widths.append(max(_max_text_length(header), _max_text_length(df.iloc[:, i].to_numpy(dtype=object))))
+    return widths
+
+def column_text_widths(ws, df=None, index=False):
+    """Hər sütunun ən uzun mətn uzunluğu: df verilibsə ondan, yoxsa sheet-in xanalarından."""
+    if df is not None:
+        return frame_text_widths(df, index)
+    return [max(len(str(cell.value or '')) for cell in col) for col in ws.columns]
+
+@functools.lru_cache(maxsize=None)
+def shared_header_styles():
+    """Başlıq xanaları üçün ortaq üslub obyektləri (hər xana üçün yenisi yaradılmır)."""
+    return {
+        'font': Font(bold=True),
+        'alignment': Alignment(horizontal='center', vertical='center'),
+    }
+
+@functools.lru_cache(maxsize=None)
+def shared_fill(color):
+    return PatternFill(start_color=color, end_color=color, fill_type="solid")
+
+def style_header_cell(cell, color=None):
+    """Başlıq xanasına ortaq qalın şrift, mərkəzləmə və (verilibsə) fon rəngi verir."""
+    styles = shared_header_styles()
+    if color:
+        cell.fill = shared_fill(color)
+    cell.font = styles['font']
+    cell.alignment = styles['alignment']
+
+def apply_wrap_alignment(ws):
+    """Bütün xanalara wrap_text verir; hər (horizontal, vertical) cütü üçün Alignment bir dəfə yaradılıb paylaşılır."""
+    resolved = {}
     for row in ws.iter_rows():
         for cell in row:
-            cell.alignment = Alignment(
-                wrap_text=True,
-                horizontal=cell.alignment.horizontal or 'left',
-                vertical=cell.alignment.vertical or 'center'
+            alignment = cell.alignment
+            key = (alignment.horizontal, alignment.vertical)
+            wrapped = resolved.get(key)
+            if wrapped is None:
+                wrapped = resolved[key] = Alignment(
+                    wrap_text=True,
+                    horizontal=alignment.horizontal or 'left',
+                    vertical=alignment.vertical or 'center'
+                )
+            cell.alignment = wrapped
+
+def merged_ranges_by_start(ws):
+    """Birləşdirilmiş aralıqların (sətir, sütun) başlanğıc xanasına görə indeksi."""
+    return {(m.min_row, m.min_col): m for m in ws.merged_cells.ranges}
+
+# ==================== YERLİ SERVİS (ASYNCIO, HTTP) ====================
+# Uzun müddət işləyən proses: cədvəllər və şəkilçi nümunələri yaddaşda qalır, eyni vaxtda gələn
+# sorğular bir batch-də birləşdirilib mühərrikə bir çağırışla verilir.
+#   POST /paradigm  {"words": [...]} -> {"paradigms": [{"Söz", "formalar"}, ...]}
+#                   (--guess-pos ilə hər sənədə "Nitq hissəsi" əlavə olunur və yalnız İsim/Sifət hallanır)
+#   GET  /metrics   gecikmə (p50/p95/p99), növbə dərinliyi, batch ölçüləri
+#   GET  /health
+SERVICE_MAX_BODY = 1 << 20
+SERVICE_LATENCY_WINDOW = 10000
+HTTP_STATUS = {
+    200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 413: 'Payload Too Large',
+    500: 'Internal Server Error'
+}
+
+def service_documents(words, suffix_examples=None, route_pos=False):
+    """Servisin mühərrik çağırışı: {lemma: sənəd}; route_pos=True - yalnız paradiqmalı nitq hissələri hallanır."""
+    unique = pd.Series(list(dict.fromkeys(words)), dtype=object)
+    documents = {word: {'Söz': word, 'formalar': []} for word in unique}
+    inflected = unique
+    if route_pos:
+        tags = detect_pos_batch(unique)
+        for word, pos in zip(unique, tags):
+            documents[word]['Nitq hissəsi'] = pos
+        inflected = unique[tags.isin(PARADIGM_POS)]
+    if len(inflected):
+        inflected, columns = paradigm_arrays(inflected)
+        # Hər slot üçün formalar bir vektor əməliyyatı ilə, sonra sənədlərə söz-söz paylanır
+        slots = [(category, key, (stems + suffixes).tolist(), suffixes.tolist())
+                 for (category, key), (stems, suffixes) in zip(PARADIGM_SLOTS, columns)]
+        for j, word in enumerate(inflected):
+            documents[word]['formalar'] = [
+                _form_entry(category, key, forms[j], suffixes[j], suffix_examples)
+                for category, key, forms, suffixes in slots
+            ]
+    return documents
+
+def new_service_metrics():
+    return {
+        'started': time.time(), 'requests': 0, 'words': 0, 'errors': 0,
+        'batches': 0, 'batch_requests_max': 0, 'batch_words_max': 0,
+        'queue_depth': 0, 'queue_depth_max': 0,
+        'latencies_ms': deque(maxlen=SERVICE_LATENCY_WINDOW)
+    }
+
+def _percentile(values, q):
+    return values[min(len(values) - 1, int(q * len(values)))] if values else None
+
+def service_metrics_report(metrics):
+    """Metriklərin JSON görünüşü; gecikmələr son SERVICE_LATENCY_WINDOW sorğu üzrədir."""
+    latencies = sorted(metrics['latencies_ms'])
+    batches = metrics['batches']
+    return {
+        'uptime_s': round(time.time() - metrics['started'], 1),
+        'requests': metrics['requests'], 'words': metrics['words'], 'errors': metrics['errors'],
+        'batches': batches,
+        'avg_batch_requests': round(metrics['requests'] / batches, 2) if batches else None,
+        'avg_batch_words': round(metrics['words'] / batches, 2) if batches else None,
+        'batch_requests_max': metrics['batch_requests_max'], 'batch_words_max': metrics['batch_words_max'],
+        'queue_depth': metrics['queue_depth'], 'queue_depth_max': metrics['queue_depth_max'],
+        'latency_ms': {
+            'p50': _percentile(latencies, 0.50), 'p95': _percentile(latencies, 0.95),
+            'p99': _percentile(latencies, 0.99), 'max': latencies[-1] if latencies else None
+        }
+    }
+
+async def _batch_loop(service):
+    """Növbədən sorğuları toplayır (max_batch_words və ya max_wait_ms həddinə qədər) və bir çağırışla hesablayır."""
+    queue, metrics = service['queue'], service['metrics']
+    loop = asyncio.get_running_loop()
+
+    def drain(items, n_words):
+        while n_words < service['max_batch_words'] and not queue.empty():
+            item = queue.get_nowait()
+            items.append(item)
+            n_words += len(item[0])
+        return n_words
+
+    while True:
+        items = [await queue.get()]
+        n_words = drain(items, len(items[0][0]))
+        if n_words < service['max_batch_words'] and service['max_wait'] > 0:
+            await asyncio.sleep(service['max_wait'])
+            n_words = drain(items, n_words)
+        metrics['queue_depth'] -= len(items)
+        words = [word for item_words, _ in items for word in item_words]
+        try:
+            documents = await loop.run_in_executor(
+                None, service_documents, words, service['suffix_examples'], service['route_pos']
             )
-    for col in ws.columns:
-        max_length = max(len(str(cell.value or "")) for cell in col)
-        ws.column_dimensions[get_column_letter(col[0].column)].width = max(min_width, min(max_length + 2, max_width))
+        except Exception as e:
+            # Mühərrik xətası sorğunun xətası deyil: ValueError/KeyError da 400 yox, 500 kimi qaytarılmalıdır
+            for _, future in items:
+                if not future.done():
+                    error = RuntimeError(f"Paradiqma mühərriki xətası: {e!r}")
+                    error.__cause__ = e
+                    future.set_exception(error)
+        else:
+            for item_words, future in items:
+                if not future.done():
+                    future.set_result([documents[word] for word in item_words])
+        metrics['batches'] += 1
+        metrics['batch_requests_max'] = max(metrics['batch_requests_max'], len(items))
+        metrics['batch_words_max'] = max(metrics['batch_words_max'], n_words)
+
+async def _paradigm_request(service, body):
+    payload = json.loads(body or b'{}')
+    if not isinstance(payload, dict):
+        raise ValueError("Sorğu JSON obyekti olmalıdır: {\"words\": [...]}")
+    words = payload.get('words', [payload['word']] if 'word' in payload else [])
+    if not isinstance(words, list):
+        raise ValueError("'words' siyahı olmalıdır")
+    words = [word for word in map(normalize_word, words) if word]
+    if not words:
+        return {'paradigms': []}
+    metrics = service['metrics']
+    future = asyncio.get_running_loop().create_future()
+    metrics['queue_depth'] += 1
+    metrics['queue_depth_max'] = max(metrics['queue_depth_max'], metrics['queue_depth'])
+    service['queue'].put_nowait((words, future))
+    documents = await future
+    metrics['requests'] += 1
+    metrics['words'] += len(words)
+    return {'paradigms': documents}
+
+async def _route_request(service, method, path, body):
+    """(status, JSON cavabı) qaytarır."""
+    path = path.split('?', 1)[0]
+    if path == '/paradigm':
+        if method != 'POST':
+            return 405, {'error': 'POST gözlənilir'}
+        start = time.perf_counter()
+        try:
+            response = await _paradigm_request(service, body)
+        except (ValueError, KeyError, TypeError) as e:
+            service['metrics']['errors'] += 1
+            return 400, {'error': str(e)}
+        except Exception as e:
+            service['metrics']['errors'] += 1
+            logger.exception("Servis sorğusu uğursuz oldu")
+            return 500, {'error': str(e)}
+        service['metrics']['latencies_ms'].append(round((time.perf_counter() - start) * 1000, 3))
+        return 200, response
+    if method != 'GET':
+        return 405, {'error': 'GET gözlənilir'}
+    if path == '/metrics':
+        return 200, service_metrics_report(service['metrics'])
+    if path == '/health':
+        return 200, {'status': 'ok'}
+    return 404, {'error': f"Naməlum yol: {path}"}
+
+async def _handle_connection(service, reader, writer):
+    """Sadə HTTP/1.1 (keep-alive) bağlantısı: sorğunu oxuyur, marşrutlayır, JSON cavab yazır."""
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line.strip():
+                break
+            method, path = request_line.decode('latin-1').split()[:2]
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+            length = int(headers.get('content-length', 0))
+            keep_alive = headers.get('connection', '').lower() != 'close'
+            if length > SERVICE_MAX_BODY:
+                status, response, keep_alive = 413, {'error': 'Sorğu çox böyükdür'}, False
+            else:
+                body = await reader.readexactly(length) if length else b''
+                status, response = await _route_request(service, method, path, body)
+            data = json.dumps(response, ensure_ascii=False).encode('utf-8')
+            writer.write((
+                f"HTTP/1.1 {status} {HTTP_STATUS[status]}\r\n"
+                f"Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(data)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+            ).encode('latin-1') + data)
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+async def _serve(host, port, unix_socket, suffix_examples, max_batch_words, max_wait_ms, route_pos):
+    service = {
+        'queue': asyncio.Queue(), 'metrics': new_service_metrics(), 'suffix_examples': suffix_examples,
+        'route_pos': route_pos, 'max_batch_words': max_batch_words, 'max_wait': max_wait_ms / 1000
+    }
+    service_documents(['kitab'], suffix_examples)  # ilk sorğudan əvvəl isinmə
+    batcher = asyncio.create_task(_batch_loop(service))
+    handler = functools.partial(_handle_connection, service)
+    if unix_socket:
+        server = await asyncio.start_unix_server(handler, path=unix_socket)
+        print(f"✅ Servis işləyir: unix:{unix_socket}")
+    else:
+        server = await asyncio.start_server(handler, host, port)
+        print(f"✅ Servis işləyir: http://{host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        batcher.cancel()
+
+def serve(host='127.0.0.1', port=8765, unix_socket=None, suffixes_file=None, max_batch_words=2048, max_wait_ms=2.0,
+          route_pos=False):
+    """Paradiqma servisini işə salır (Ctrl+C ilə dayanır)."""
+    suffix_examples = read_suffix_examples_from_excel(suffixes_file) if suffixes_file else {}
+    try:
+        asyncio.run(_serve(host, port, unix_socket, suffix_examples, max_batch_words, max_wait_ms, route_pos))
+    except KeyboardInterrupt:
+        print("⏹️ Servis dayandırıldı")
+
+# ==================== QALAN FUNKSİYALAR EYNİ QALIR ====================
+def set_column_width_and_wrap(ws, min_width=12, max_width=40, df=None, index=False):
+    """Sütun enini və wrap_text-i tənzimləyir; df verilibsə enlər cədvəldən hesablanır."""
+    with stage('styling'):
+        apply_wrap_alignment(ws)
+    with stage('width_pass'):
+        for i, max_length in enumerate(column_text_widths(ws, df, index), 1):
+            ws.column_dimensions[get_column_letter(i)].width = max(min_width, min(max_length + 2, max_width))
 
 def remove_sheets(wb, sheet_names):
     """Verilmiş sheet-ləri silir."""
@@ -485,25 +2179,195 @@ def remove_sheets(wb, sheet_names):
 
 def write_multiindex_to_excel(df, output_file, sheet_name):
     """MultiIndex başlıqlı DataFrame-i Excel-ə yazır."""
-    with pd.ExcelWriter(output_file, engine='openpyxl', mode='a', if_sheet_exists='replace') as writer:
-        df.to_excel(writer, sheet_name=sheet_name)  # index parametri olmadan, çünki MultiIndex-də index=False dəstəklənmir
+    with excel_writer(output_file, mode='a', if_sheet_exists='replace') as writer:
+        write_sheet(writer, df, sheet_name, index=True)  # index parametri olmadan, çünki MultiIndex-də index=False dəstəklənmir
+
+SUFFIX_SNAPSHOT_VERSION = 1
+
+def _file_sha256(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
 
-def read_suffix_examples_from_excel(file_path):
+def _cell_text(value):
+    """Xana dəyərini mətnə çevirir; boş/NaN xanalar üçün ''."""
+    if value is None or (isinstance(value, float) and value != value):
+        return ''
+    return str(value).strip()
+
+def load_suffix_examples_sheet(file_path, sheet_name="Şəkilçilər və Nümunələr"):
+    """Sheet-dən yalnız Şəkilçi və Nümunə sütunlarını read-only rejimdə oxuyur; boş xanalar atlanır."""
+    wb = load_workbook(file_path, read_only=True)
     try:
-        df = pd.read_excel(file_path, sheet_name="Şəkilçilər və Nümunələr")
+        rows = wb[sheet_name].iter_rows(values_only=True)
+        header = [_cell_text(value) for value in next(rows, ())]
+        suffix_col, example_col = header.index('Şəkilçi'), header.index('Nümunə')
+        first = min(suffix_col, example_col)
+        rows = wb[sheet_name].iter_rows(min_row=2, min_col=first + 1, max_col=max(suffix_col, example_col) + 1,
+                                        values_only=True)
         examples = {}
-        for _, row in df.iterrows():
-            suffix = str(row.get('Şəkilçi')).strip()
-            example = str(row.get('Nümunə')).strip()
+        for row in rows:
+            suffix = _cell_text(row[suffix_col - first]) if len(row) > suffix_col - first else ''
+            example = _cell_text(row[example_col - first]) if len(row) > example_col - first else ''
             if suffix and example:
                 examples[suffix] = example
         return examples
+    finally:
+        wb.close()
+
+SUFFIX_SNAPSHOT_KEYS = ('mtime_ns', 'size', 'sha256', 'examples')
+
+def _read_suffix_snapshot(snapshot_file):
+    """Snapshot-u oxuyur; yoxdursa, köhnə versiyadırsa və ya oxunmursa (yarımçıq/pozulmuş fayl) None."""
+    try:
+        with open(snapshot_file, encoding='utf-8') as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get('version') != SUFFIX_SNAPSHOT_VERSION \
+            or any(key not in snapshot for key in SUFFIX_SNAPSHOT_KEYS) or not isinstance(snapshot['examples'], dict):
+        return None
+    return snapshot
+
+def _replace_json_file(json_file, data):
+    """JSON-u müvəqqəti fayla yazıb os.replace ilə əvəz edir, ona görə yarımçıq fayl qalmır."""
+    directory = os.path.dirname(os.path.abspath(json_file))
+    tmp_file = None
+    try:
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=directory, suffix='.tmp', delete=False) as f:
+            tmp_file = f.name
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_file, json_file)
+    except OSError:
+        if tmp_file and os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
+
+def _write_suffix_snapshot(snapshot_file, snapshot):
+    """Snapshot-u atomik yazır; yazıla bilməyən snapshot sadəcə keşsiz iş deməkdir."""
+    try:
+        _replace_json_file(snapshot_file, snapshot)
+    except OSError:
+        pass
+
+def read_suffix_examples_from_excel(file_path, snapshot_file=None, strict=False):
+    """Şəkilçi -> nümunə lüğəti; mənbə fayl dəyişənə qədər JSON snapshot-dan oxunur (snapshot_file=False - snapshot-suz).
+
+    Fayl oxunmayanda {} qaytarılır; strict=True olanda xəta qaldırılır.
+    """
+    if snapshot_file is None:
+        snapshot_file = os.path.splitext(file_path)[0] + '_şəkilçilər.json'
+    try:
+        stat = os.stat(file_path)
+        snapshot = _read_suffix_snapshot(snapshot_file) if snapshot_file else None
+        if snapshot and snapshot['mtime_ns'] == stat.st_mtime_ns and snapshot['size'] == stat.st_size:
+            return snapshot['examples']
+
+        sha256 = _file_sha256(file_path)
+        if snapshot and snapshot['sha256'] == sha256:
+            examples = snapshot['examples']
+        else:
+            examples = load_suffix_examples_sheet(file_path)
+        if snapshot_file:
+            _write_suffix_snapshot(snapshot_file, {
+                'version': SUFFIX_SNAPSHOT_VERSION, 'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size,
+                'sha256': sha256, 'examples': examples
+            })
+        return examples
     except Exception as e:
+        if strict:
+            raise
         print(f"Şəkilçilər və Nümunələr sheet-i tapılmadı və ya oxunmadı: {e}")
         return {}
 
 # ==================== ƏSAS BLOK ====================
 if __name__ == "__main__":
-    process_words("input_2427.xlsx", "az_grammar_output.xlsx")
-    extract_unique_suffixes_and_examples_with_code_suffixes("az_grammar_output.xlsx", "az_grammar_output.xlsx")
-    create_isimler_sheet_with_grouped_headers("az_grammar_output.xlsx")
+    parser = argparse.ArgumentParser(description="Azərbaycan dili sözləri üçün paradiqma generatoru")
+    parser.add_argument('input_file', nargs='?', default="input_2427.xlsx")
+    parser.add_argument('output_file', nargs='?', default="az_grammar_output.xlsx",
+                        help="çıxış faylı; format uzantıdan seçilir (.xlsx, .csv, .jsonl, .parquet, .feather/.arrow)")
+    parser.add_argument('--suffixes-file', help="'Şəkilçilər və Nümunələr' sheet-i olan Excel faylı")
+    parser.add_argument('--workers', type=int, default=1, help="paralel işçi proseslərin sayı")
+    parser.add_argument('--rows-per-shard', type=int, default=EXCEL_MAX_ROWS - 1, metavar='N',
+                        help="Bütün_Sözlər sheet-inin ən çox sətir sayı; artıq sözlər Bütün_Sözlər_2, _3, ... "
+                             f"sheet-lərinə keçir (ən azı {len(PARADIGM_SLOTS)})")
+    parser.add_argument('--manifest', metavar='JSON_FILE',
+                        help="Bütün_Sözlər hissələrinin manifest-ini (sheet, söz aralığı) JSON faylına yaz")
+    parser.add_argument('--serve', action='store_true',
+                        help="iş kitabı yazmaq əvəzinə yerli HTTP paradiqma servisini işə sal")
+    parser.add_argument('--host', default='127.0.0.1', help="--serve üçün ünvan")
+    parser.add_argument('--port', type=int, default=8765, help="--serve üçün port")
+    parser.add_argument('--unix-socket', help="--serve üçün TCP əvəzinə Unix soketi")
+    parser.add_argument('--max-batch-words', type=int, default=2048, help="bir batch-də ən çox söz sayı")
+    parser.add_argument('--max-wait-ms', type=float, default=2.0,
+                        help="batch-i doldurmaq üçün ilk sorğudan sonra gözləmə (ms)")
+    parser.add_argument('--suffix-index', metavar='JSON_FILE',
+                        help="generasiya zamanı qurulan şəkilçi indeksini (say, sözlər, slotlar) JSON faylına yaz")
+    parser.add_argument('--raw-input', action='store_true',
+                        help="girişi normallaşdırma: sözləri olduğu kimi (təkrarlar və boşlar daxil) hallandır; "
+                             "boş xana 'nan' kimi yazılır")
+    parser.add_argument('--row-map', action='store_true',
+                        help="giriş sətirlərini lemmalara bağlayan Giriş_Xəritəsi sheet-ini əlavə et")
+    parser.add_argument('--all-words', action='store_true',
+                        help="nitq hissəsinə görə yönləndirmə etmə: bütün sözləri isim kimi hallandır")
+    parser.add_argument('--guess-pos', action='store_true',
+                        help="'Nitq hissəsi' etiketi olmayan sözlərin nitq hissəsini sonluq qaydaları ilə təxmin et "
+                             "(-la/-ca -> Zərf, -maq -> Fel; bəzi isimləri də atır)")
+    parser.add_argument('--delta-dir', metavar='DIR',
+                        help="output_file əvəzinə DIR-ə yalnız əvvəlki işlərdə olmayan sözlərin hissə iş kitabını "
+                             "(part_NNNN.xlsx) yaz; tam iş kitabı yazılmır, girişdən çıxan sözlər "
+                             "delta_manifest.json-un 'removed' siyahısına düşür")
+    parser.add_argument('--stream', action='store_true',
+                        help="sabit yaddaşlı axın rejimi (stream_process_words): giriş sətir-sətir oxunur və "
+                             "write-only iş kitabına yazılır; İsimlər və Şəkilçilər sheet-ləri qurulmur")
+    parser.add_argument('--no-dedupe', action='store_true',
+                        help="--stream ilə: təkrar lemmaları atma, yaddaş unikal lemmaların sayı ilə artmasın")
+    parser.add_argument('--profile', nargs='?', const=True, default=False, metavar='PROF_FILE',
+                        help="cProfile ilə profil çıxar; fayl verilibsə .prof kimi də yaz")
+    parser.add_argument('--report', metavar='JSONL_FILE', help="mərhələ hesabatlarını JSON Lines faylına əlavə et")
+    args = parser.parse_args()
+    output_format = export_format(args.output_file)
+    if args.rows_per_shard < len(PARADIGM_SLOTS):
+        parser.error(f"--rows-per-shard ən azı {len(PARADIGM_SLOTS)} olmalıdır")
+    if not (args.serve or args.delta_dir):
+        if output_format is None:
+            parser.error(f"naməlum çıxış formatı: {args.output_file}")
+        if output_format != 'xlsx' and (args.row_map or args.suffix_index or args.manifest or args.workers != 1
+                                        or args.rows_per_shard != EXCEL_MAX_ROWS - 1):
+            parser.error("--row-map, --suffix-index, --manifest, --rows-per-shard və --workers yalnız .xlsx çıxışı üçündür")
+    if args.stream and (output_format != 'xlsx' or args.delta_dir or args.serve or args.suffix_index
+                        or args.workers != 1):
+        parser.error("--stream yalnız .xlsx çıxışı üçündür; --delta-dir, --serve, --suffix-index və --workers ilə işləmir")
+    if args.no_dedupe and not args.stream:
+        parser.error("--no-dedupe yalnız --stream ilə işləyir")
+
+    if args.profile or args.report:
+        logging.basicConfig(level=logging.INFO, format='%(message)s')
+    configure_instrumentation(profile=args.profile, report_file=args.report)
+
+    if args.serve:
+        serve(args.host, args.port, args.unix_socket, suffixes_file=args.suffixes_file,
+              max_batch_words=args.max_batch_words, max_wait_ms=args.max_wait_ms, route_pos=args.guess_pos)
+        sys.exit(0)
+
+    route_pos = False if args.all_words else (True if args.guess_pos else None)
+    if args.stream:
+        stream_process_words(args.input_file, args.output_file, suffixes_file=args.suffixes_file,
+                             rows_per_shard=args.rows_per_shard, manifest_file=args.manifest, route_pos=route_pos,
+                             normalize=not args.raw_input, row_map=args.row_map, dedupe=not args.no_dedupe)
+        sys.exit(0)
+
+    df_input = pd.read_excel(args.input_file)
+    if args.delta_dir:
+        build_delta_workbook(df_input['Söz'], args.delta_dir, suffixes_file=args.suffixes_file,
+                             rows_per_shard=args.rows_per_shard, workers=args.workers, route_pos=route_pos,
+                             normalize=not args.raw_input, pos_labels=df_input.get(POS_INPUT_COLUMN))
+        sys.exit(0)
+    options = {}
+    if output_format == 'xlsx':
+        options = dict(workers=args.workers, row_map=args.row_map, suffix_index_file=args.suffix_index,
+                       rows_per_shard=args.rows_per_shard, manifest_file=args.manifest)
+    export_paradigms(df_input['Söz'], args.output_file, suffixes_file=args.suffixes_file, route_pos=route_pos,
+                     normalize=not args.raw_input, pos_labels=df_input.get(POS_INPUT_COLUMN), **options)
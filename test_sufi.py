@@ -0,0 +1,666 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+from openpyxl import load_workbook
+
+import sufi
+from benchmark import HEAVY_MODULES, synthetic_lexicon
+
+# ==================== SÖZ NÜMUNƏLƏRİ ====================
+EDGE_WORDS = ['', 'xyz', 'la', 'iz', 'su', 'ata', 'ana', 'kitab', 'ev', 'alma', 'göz', 'quzu', 'ütü']
+
+@pytest.fixture(scope='module')
+def lexicon():
+    """input.xlsx sözləri, bütün ahəng siniflərini əhatə edən sintetik leksikon, SPECIAL_WORDS və kənar hallar."""
+    words = pd.read_excel('input.xlsx')['Söz'].astype(str).tolist()
+    words += synthetic_lexicon(2000, special_rate=0.05) + list(sufi.SPECIAL_WORDS) + EDGE_WORDS
+    return list(dict.fromkeys(words))
+
+# ==================== BAŞLANĞIC ====================
+def test_import_does_not_load_heavy_modules():
+    """Morfologiya nüvəsi numpy/pandas/openpyxl-siz idxal olunur və işləyir (təmiz prosesdə yoxlanır)."""
+    code = ("import sys, sufi; "
+            "assert sufi.generate_case('kitab', 'Yerlik') == 'kitabda'; "
+            "assert sufi.detect_pos('gözəl') == 'İsim'; "
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                         cwd=os.path.dirname(os.path.abspath(__file__)))
+    assert out.stdout.strip() == ''
+
+# ==================== İNSTRUMENTASİYA ====================
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason="RSS zirvəsi yalnız Linux-da sıfırlanır")
+def test_stages_keep_process_peak_without_instrumentation():
+    """İnstrumentasiya olmadan mərhələlər prosesin VmHWM/ru_maxrss zirvəsini sıfırlamır."""
+    assert not sufi.instrumentation_active()
+    block = b'x' * (256 * 1024 * 1024)
+    del block
+    before = sufi.peak_rss_mb()
+    assert before > 256
+    with sufi.stage('noop'):
+        pass
+    with sufi.track_peak_rss() as peak:
+        pass
+    assert sufi.peak_rss_mb() >= before
+    assert peak['peak_rss_mb'] >= before
+
+# ==================== CƏDVƏL MÜHƏRRİKİ (KÖHNƏ GENERATORLARLA MÜQAYİSƏ) ====================
+# Cədvəl mühərrikindən əvvəlki generatorlar: hər çağırışda son sait və son səsə görə cədvəldən seçim
+# Cədvəllər refaktordan əvvəlki sufi.py-dan hərfi köçürülüb ki, müqayisə sufi-nin öz cədvəllərindən asılı olmasın
+OLD_VOWELS = 'aıouəeiöü'
+OLD_BACK_VOWELS = 'aıou'
+OLD_SPECIAL_WORDS = {
+    'su': {'plural': 'sular', 'possessive': {'1s': 'suyum', '3s': 'suyu'}, 'case': {'Yönlük': 'suya', 'Yerlik': 'suda'}},
+    'ata': {'case': {'Yönlük': 'ataya'}},
+    'ana': {'possessive': {'1s': 'anam'}}
+}
+OLD_CASE_CONSONANT = {
+    'a': {'Yiyəlik': 'ın', 'Yönlük': 'a', 'Təsirlik': 'ı', 'Yerlik': 'da', 'Çıxışlıq': 'dan'},
+    'ı': {'Yiyəlik': 'ın', 'Yönlük': 'a', 'Təsirlik': 'ı', 'Yerlik': 'da', 'Çıxışlıq': 'dan'},
+    'ə': {'Yiyəlik': 'in', 'Yönlük': 'ə', 'Təsirlik': 'i', 'Yerlik': 'də', 'Çıxışlıq': 'dən'},
+    'i': {'Yiyəlik': 'in', 'Yönlük': 'ə', 'Təsirlik': 'i', 'Yerlik': 'də', 'Çıxışlıq': 'dən'},
+    'o': {'Yiyəlik': 'un', 'Yönlük': 'a', 'Təsirlik': 'u', 'Yerlik': 'da', 'Çıxışlıq': 'dan'},
+    'u': {'Yiyəlik': 'un', 'Yönlük': 'a', 'Təsirlik': 'u', 'Yerlik': 'da', 'Çıxışlıq': 'dan'},
+    'ö': {'Yiyəlik': 'ün', 'Yönlük': 'ə', 'Təsirlik': 'ü', 'Yerlik': 'də', 'Çıxışlıq': 'dən'},
+    'ü': {'Yiyəlik': 'ün', 'Yönlük': 'ə', 'Təsirlik': 'ü', 'Yerlik': 'də', 'Çıxışlıq': 'dən'}
+}
+OLD_CASE_VOWEL = {
+    'a': {'Yiyəlik': 'nın', 'Yönlük': 'ya', 'Təsirlik': 'nı', 'Yerlik': 'da', 'Çıxışlıq': 'dan'},
+    'ı': {'Yiyəlik': 'nın', 'Yönlük': 'ya', 'Təsirlik': 'nı', 'Yerlik': 'da', 'Çıxışlıq': 'dan'},
+    'ə': {'Yiyəlik': 'nin', 'Yönlük': 'yə', 'Təsirlik': 'ni', 'Yerlik': 'də', 'Çıxışlıq': 'dən'},
+    'i': {'Yiyəlik': 'nin', 'Yönlük': 'yə', 'Təsirlik': 'ni', 'Yerlik': 'də', 'Çıxışlıq': 'dən'},
+    'o': {'Yiyəlik': 'nun', 'Yönlük': 'ya', 'Təsirlik': 'nu', 'Yerlik': 'da', 'Çıxışlıq': 'dan'},
+    'u': {'Yiyəlik': 'nun', 'Yönlük': 'ya', 'Təsirlik': 'nu', 'Yerlik': 'da', 'Çıxışlıq': 'dan'},
+    'ö': {'Yiyəlik': 'nün', 'Yönlük': 'yə', 'Təsirlik': 'nü', 'Yerlik': 'də', 'Çıxışlıq': 'dən'},
+    'ü': {'Yiyəlik': 'nün', 'Yönlük': 'yə', 'Təsirlik': 'nü', 'Yerlik': 'də', 'Çıxışlıq': 'dən'}
+}
+OLD_POSSESSIVE_VOWEL = {
+    "1s": {"a": "m", "ı": "m", "ə": "m", "i": "m", "o": "m", "u": "m", "ö": "m", "ü": "m"},
+    "2s": {"a": "n", "ı": "n", "ə": "n", "i": "n", "o": "n", "u": "n", "ö": "n", "ü": "n"},
+    "3s": {"a": "sı", "ı": "sı", "ə": "si", "i": "si", "o": "su", "u": "su", "ö": "sü", "ü": "sü"},
+    "1p": {"a": "mız", "ı": "mız", "ə": "miz", "i": "miz", "o": "muz", "u": "muz", "ö": "müz", "ü": "müz"},
+    "2p": {"a": "nız", "ı": "nız", "ə": "niz", "i": "niz", "o": "nuz", "u": "nuz", "ö": "nüz", "ü": "nüz"},
+    "3p": {"a": "ları", "ı": "ları", "ə": "ləri", "i": "ləri", "o": "ları", "u": "ları", "ö": "ləri", "ü": "ləri"}
+}
+OLD_POSSESSIVE_CONSONANT = {
+    "1s": {"a": "ım", "ı": "ım", "ə": "im", "i": "im", "o": "um", "u": "um", "ö": "üm", "ü": "üm"},
+    "2s": {"a": "ın", "ı": "ın", "ə": "in", "i": "in", "o": "un", "u": "un", "ö": "ün", "ü": "ün"},
+    "3s": {"a": "ı", "ı": "ı", "ə": "i", "i": "i", "o": "u", "u": "u", "ö": "ü", "ü": "ü"},
+    "1p": {"a": "ımız", "ı": "ımız", "ə": "imiz", "i": "imiz", "o": "umuz", "u": "umuz", "ö": "ümüz", "ü": "ümüz"},
+    "2p": {"a": "ınız", "ı": "ınız", "ə": "iniz", "i": "iniz", "o": "unuz", "u": "unuz", "ö": "ünüz", "ü": "ünüz"},
+    "3p": {"a": "ları", "ı": "ları", "ə": "ləri", "i": "ləri", "o": "ları", "u": "ları", "ö": "ləri", "ü": "ləri"}
+}
+OLD_XEBERLIK_VOWEL = {
+    "1s": {"a": "yam", "ı": "yam", "ə": "yəm", "i": "yəm", "o": "yam", "u": "yam", "ö": "yəm", "ü": "yəm"},
+    "2s": {"a": "san", "ı": "san", "ə": "sən", "i": "sən", "o": "san", "u": "san", "ö": "sən", "ü": "sən"},
+    "3s": {"a": "dır", "ı": "dır", "ə": "dir", "i": "dir", "o": "dur", "u": "dur", "ö": "dür", "ü": "dür"},
+    "1p": {"a": "yıq", "ı": "yıq", "ə": "yik", "i": "yik", "o": "yuq", "u": "yuq", "ö": "yük", "ü": "yük"},
+    "2p": {"a": "sınız", "ı": "sınız", "ə": "siniz", "i": "siniz", "o": "sunuz", "u": "sunuz", "ö": "sünüz", "ü": "sünüz"},
+    "3p": {"a": "dırlar", "ı": "dırlar", "ə": "dirlər", "i": "dirlər", "o": "durlar", "u": "durlar", "ö": "dürlər", "ü": "dürlər"}
+}
+OLD_XEBERLIK_CONSONANT = {
+    "1s": {"a": "am", "ı": "am", "ə": "əm", "i": "əm", "o": "am", "u": "am", "ö": "əm", "ü": "əm"},
+    "2s": {"a": "san", "ı": "san", "ə": "sən", "i": "sən", "o": "san", "u": "san", "ö": "sən", "ü": "sən"},
+    "3s": {"a": "dır", "ı": "dır", "ə": "dir", "i": "dir", "o": "dur", "u": "dur", "ö": "dür", "ü": "dür"},
+    "1p": {"a": "ıq", "ı": "ıq", "ə": "ik", "i": "ik", "o": "uq", "u": "uq", "ö": "ük", "ü": "ük"},
+    "2p": {"a": "sınız", "ı": "sınız", "ə": "siniz", "i": "siniz", "o": "sunuz", "u": "sunuz", "ö": "sünüz", "ü": "sünüz"},
+    "3p": {"a": "dırlar", "ı": "dırlar", "ə": "dirlər", "i": "dirlər", "o": "durlar", "u": "durlar", "ö": "dürlər", "ü": "dürlər"}
+}
+
+def old_last_vowel(word):
+    for ch in reversed(word):
+        if ch in OLD_VOWELS:
+            return ch
+    return None
+
+def old_plural(word):
+    if word in OLD_SPECIAL_WORDS:
+        return OLD_SPECIAL_WORDS[word].get('plural', word + 'lar')
+    last_v = old_last_vowel(word)
+    if not last_v:
+        return word
+    return f"{word}lar" if last_v in OLD_BACK_VOWELS else f"{word}lər"
+
+def old_case(word, case):
+    if word in OLD_SPECIAL_WORDS and case in OLD_SPECIAL_WORDS[word].get('case', {}):
+        return OLD_SPECIAL_WORDS[word]['case'][case]
+    last_v = old_last_vowel(word)
+    if not last_v:
+        return word
+    case_map = OLD_CASE_VOWEL if word[-1] in OLD_VOWELS else OLD_CASE_CONSONANT
+    return word + case_map.get(last_v, {}).get(case, '')
+
+def old_possessive(word, person, plural):
+    if word in OLD_SPECIAL_WORDS and person in OLD_SPECIAL_WORDS[word].get('possessive', {}):
+        return OLD_SPECIAL_WORDS[word]['possessive'][person]
+    last_v = old_last_vowel(word)
+    if not last_v:
+        return word
+    base = old_plural(word) if plural else word
+    suffix_map = OLD_POSSESSIVE_VOWEL if word[-1] in OLD_VOWELS else OLD_POSSESSIVE_CONSONANT
+    return base + suffix_map.get(person, {}).get(last_v, '')
+
+def old_xeberlik(word, person):
+    last_v = old_last_vowel(word)
+    if not last_v:
+        return word
+    suffix_map = OLD_XEBERLIK_VOWEL if word[-1] in OLD_VOWELS else OLD_XEBERLIK_CONSONANT
+    return word + suffix_map.get(person, {}).get(last_v, '')
+
+def test_generators_match_old_tables(lexicon):
+    for word in lexicon:
+        assert sufi.generate_plural(word) == old_plural(word), word
+        for case in sufi.CASES:
+            assert sufi.generate_case(word, case) == old_case(word, case), (word, case)
+        for person in sufi.PERSONS:
+            for plural in (False, True):
+                assert sufi.generate_possessive(word, person, plural) == old_possessive(word, person, plural), \
+                    (word, person, plural)
+            assert sufi.generate_xeberlik(word, person) == old_xeberlik(word, person), (word, person)
+
+def test_paradigm_matches_inflect(lexicon):
+    for word in lexicon:
+        forms = sufi.paradigm(word)
+        assert list(forms) == list(sufi.PARADIGM_SLOTS)
+        for slot, form in forms.items():
+            assert sufi.inflect(word, slot) == form, (word, slot)
+
+# ==================== VEKTORLAŞDIRILMIŞ GENERASİYA ====================
+def test_generate_paradigms_matches_scalar(lexicon):
+    table = sufi.generate_paradigms(pd.Series(lexicon))
+    assert list(table.columns) == ['Söz'] + [key for _, key in sufi.PARADIGM_SLOTS]
+    for word, row in zip(lexicon, table.itertuples(index=False)):
+        assert list(row) == [word] + list(sufi.paradigm(word).values()), word
+
+def test_generate_paradigms_keeps_index_and_order():
+    words = pd.Series(['ev', 'su', 'kitab', 'ev'], index=[10, 3, 7, 1])
+    table = sufi.generate_paradigms(words)
+    assert list(table.index) == [10, 3, 7, 1]
+    assert table['Söz'].tolist() == ['ev', 'su', 'kitab', 'ev']
+    assert table['Cəm forması'].tolist() == ['evlər', 'sular', 'kitablar', 'evlər']
+
+def suffix_index_summary(index):
+    """Şəkilçi indeksinin massivlərdən asılı olmayan görünüşü: şəkilçi -> (say, nümunə, slot -> söz mövqeləri)."""
+    return {
+        suffix: (entry['count'], entry['example'],
+                 {slot: sorted(int(p) for parts in arrays for p in parts) for slot, arrays in entry['slots'].items()})
+        for suffix, entry in index['suffixes'].items()
+    }, sufi.suffix_index_words(index).tolist()
+
+def test_parallel_display_table_matches_single_process(lexicon):
+    words = pd.Series(lexicon[:200])
+    serial_index, parallel_index = sufi.new_suffix_index(), sufi.new_suffix_index()
+    serial = sufi.build_display_table_parallel(words, workers=1, suffix_index=serial_index)
+    parallel = sufi.build_display_table_parallel(words, workers=2, chunk_size=7, suffix_index=parallel_index)
+    assert parallel.equals(serial)
+    assert suffix_index_summary(parallel_index) == suffix_index_summary(serial_index)
+
+# ==================== FORMA QEYDLƏRİ (KÖK + ŞƏKİLÇİ) ====================
+def test_records_rebuild_paradigm(lexicon):
+    for word in lexicon:
+        records = sufi.paradigm_records(word)
+        assert [r.form for r in records] == list(sufi.paradigm(word).values()), word
+        assert [(r.category, r.slot) for r in records] == list(sufi.PARADIGM_SLOTS)
+        if word not in sufi.SPECIAL_WORDS:
+            plural = records[0].form
+            for record in records:
+                slot = (record.category, record.slot)
+                assert record.stem == (plural if slot in sufi.PLURAL_BASED_SLOTS else word), (word, slot)
+
+def test_vectorized_records_match_scalar(lexicon):
+    words, columns = sufi.paradigm_arrays(pd.Series(lexicon))
+    for i, word in enumerate(words):
+        expected = [(r.stem, r.suffix) for r in sufi.paradigm_records(word)]
+        assert [(stems[i], suffixes[i]) for stems, suffixes in columns] == expected, word
+
+@pytest.mark.parametrize('word, slot, stem, suffix', [
+    ('su', ('Mənsubiyyət', '3s_tək'), 'su', 'yu'),
+    ('su', ('Mənsubiyyət', '1s_cəm'), 'su', 'yum'),
+    ('ana', ('Mənsubiyyət', '1s_cəm'), 'ana', 'm'),
+    ('iz', ('Mənsubiyyət', '1p_tək'), 'iz', 'imiz'),
+    ('la', ('Cəm', 'Cəm forması'), 'la', 'lar'),
+    ('kitab', ('Mənsubiyyət', '3p_cəm'), 'kitablar', 'ları'),
+])
+def test_record_split(word, slot, stem, suffix):
+    record = sufi.paradigm_records(word)[sufi.SLOT_INDEX[slot]]
+    assert (record.stem, record.suffix) == (stem, suffix)
+
+def test_display_table_matches_format_record(lexicon):
+    examples = {'lar': 'kitablar', 'da': 'evdə', 'yu': 'suyu'}
+    display = sufi.build_display_table(pd.Series(lexicon), examples)
+    for word, row in zip(lexicon, display.itertuples(index=False)):
+        expected = [sufi.format_record(r, examples) for r in sufi.paradigm_records(word)]
+        assert list(row)[1:] == expected, word
+
+# ==================== ŞƏKİLÇİ İNDEKSİ ====================
+def test_chunked_suffix_index_matches_direct_build(lexicon):
+    words = pd.Series(lexicon[:300])
+    index = sufi.new_suffix_index()
+    for start in range(0, len(words), 37):
+        part = sufi.new_suffix_index()
+        chunk, columns = sufi.paradigm_arrays(words.iloc[start:start + 37])
+        sufi.update_suffix_index(part, chunk, columns)
+        sufi.merge_suffix_index(index, part)
+    assert suffix_index_summary(index) == suffix_index_summary(sufi.build_suffix_index(words))
+
+def test_suffix_lemmas():
+    index = sufi.build_suffix_index(['kitab', 'ev', 'qız', 'alma', 'su', 'göz'])
+    assert sufi.suffix_lemmas(index, 'ımız') == ['kitab', 'qız']
+    assert sufi.suffix_lemmas(index, 'ımız', category='Xəbərlik') == []
+    assert sufi.suffix_lemmas(index, 'ümüz') == ['göz']
+    assert sufi.suffix_lemmas(index, 'yox') == []
+
+def test_workbook_suffix_sheet_matches_all_words_scan(lexicon, tmp_path):
+    sufi.build_workbook(pd.Series(lexicon[:300]), str(tmp_path / 'out.xlsx'))
+    sheets = pd.read_excel(tmp_path / 'out.xlsx', sheet_name=None, keep_default_na=False)
+    assert sheets['Şəkilçilər və Nümunələr'].equals(sufi.build_suffix_examples_table(sheets['Bütün_Sözlər']['Yeni Söz']))
+
+# ==================== TƏRSİNƏ TƏHLİL (ANALİZATOR) ====================
+def test_analyze_recovers_every_generated_form(lexicon):
+    for word in filter(None, lexicon):
+        for record in sufi.paradigm_records(word):
+            analyses = {(a.root, a.category, a.slot) for a in sufi.analyze(record.form)}
+            assert (word, record.category, record.slot) in analyses, (word, record)
+
+def test_analyze_always_offers_the_bare_lemma(lexicon):
+    for word in filter(None, lexicon):
+        analyses = sufi.analyze(word)
+        assert sufi.Analysis(word, (), 'Hal', 'Adlıq') in analyses, word
+        assert sufi.StackedForm(word, word, (), False, None, 'Adlıq', None) in sufi.analyze_stacked(word), word
+        # Şəkilçisiz təhlillər şəkilçililərdən sonra gəlir
+        assert analyses == sorted(analyses, key=lambda a: not a.suffixes), word
+
+def test_analyze_rejects_harmony_mismatch():
+    assert sufi.analyze('kitablər') == [sufi.Analysis('kitablər', (), 'Hal', 'Adlıq')]
+
+def test_bare_reading_comes_last():
+    assert sufi.analyze('ata')[-1] == sufi.Analysis('ata', (), 'Hal', 'Adlıq')
+    assert sufi.analyze('ata')[0] == sufi.Analysis('at', ('a',), 'Hal', 'Yönlük')
+    assert sufi.analyze('kitablarımızda')[-1] == sufi.Analysis('kitablarımızda', (), 'Hal', 'Adlıq')
+    assert sufi.analyze_stacked('xyzq') == [sufi.StackedForm('xyzq', 'xyzq', (), False, None, 'Adlıq', None)]
+
+# Hər fonoloji sinifdən, SPECIAL_WORDS-dan və kənar hallardan sözlər
+STACKED_WORDS = ['kitab', 'alma', 'qapı', 'bulud', 'quzu', 'ev', 'kənd', 'dəftər', 'gül', 'ütü', 'xyz', 'su', 'ata',
+                 'ana', 'la', 'iz']
+
+def test_analyze_stacked_recovers_every_stacked_form():
+    for stacked in sufi.iter_stacked_forms(STACKED_WORDS):
+        analyses = sufi.analyze_stacked(stacked.form)
+        if stacked.form == stacked.word:
+            # Şəkilçisiz formanın bir təhlili var: BARE_STACK, siyahının sonunda
+            assert analyses[-1] == sufi.StackedForm(stacked.word, stacked.word, (), *sufi.BARE_STACK), stacked
+        else:
+            assert stacked in analyses, stacked
+
+def test_analyze_stacked_splits_every_layer():
+    assert sufi.StackedForm('kitab', 'kitab', ('lar', 'ımız', 'da'), True, '1p', 'Yerlik', None) in \
+        sufi.analyze_stacked('kitablarımızda')
+    assert sufi.analyze_batch(['kitabına', 'kitabına'], stacked=True)[1] == sufi.analyze_stacked('kitabına')
+
+@pytest.mark.parametrize('form, slot', [
+    ('suyum', ('Mənsubiyyət', '1s_tək')),
+    ('suya', ('Hal', 'Yönlük')),
+])
+def test_analyze_irregular_forms(form, slot):
+    assert sufi.Analysis('su', (form[2:],), *slot) in sufi.analyze(form)
+
+# ==================== QAT-QAT FORMALAR ====================
+@pytest.mark.parametrize('word, plural, person, expected', [
+    ('kitab', False, '3s', ['kitabına', 'kitabında', 'kitabından']),
+    ('kitab', False, '3p', ['kitablarına', 'kitablarında', 'kitablarından']),
+    ('kitab', True, '3s', ['kitablarına', 'kitablarında', 'kitablarından']),
+    ('kitab', True, '3p', ['kitablarına', 'kitablarında', 'kitablarından']),
+    ('göz', True, '3p', ['gözlərinə', 'gözlərində', 'gözlərindən']),
+    ('alma', False, '3s', ['almasına', 'almasında', 'almasından']),
+    ('göz', False, '3s', ['gözünə', 'gözündə', 'gözündən']),
+    ('göz', False, '3p', ['gözlərinə', 'gözlərində', 'gözlərindən']),
+    ('quzu', True, '3s', ['quzularına', 'quzularında', 'quzularından']),
+    ('su', False, '3s', ['suyuna', 'suyunda', 'suyundan']),
+])
+def test_pronominal_n_after_third_person_possessive(word, plural, person, expected):
+    forms = sufi.iter_stacked_forms(word, plural=(plural,), possessive=(person,),
+                                    case=('Yönlük', 'Yerlik', 'Çıxışlıq'), xeberlik=(None,))
+    assert [f.form for f in forms] == expected
+
+@pytest.mark.parametrize('word, expected', [('kitab', 'kitabları'), ('göz', 'gözləri'), ('su', 'suları')])
+def test_plural_third_person_plural_possessive(word, expected):
+    [form] = sufi.iter_stacked_forms(word, plural=(True,), possessive=('3p',), case=('Adlıq',), xeberlik=(None,))
+    assert (form.form, form.suffixes[-1]) == (expected, expected[-1])
+    # Cəmsiz 3p eyni formanı verdiyi üçün hər iki cəm seçimi ilə forma bir dəfə sayılır və yaradılır
+    forms = [f.form for f in sufi.iter_stacked_forms(word, possessive=('3p',), case=('Adlıq',), xeberlik=(None,))]
+    assert forms == [expected]
+    assert sufi.count_stacked_forms(word, possessive=('3p',), case=('Adlıq',), xeberlik=(None,)) == 1
+
+def test_stacked_form_count_is_exact(lexicon):
+    words = lexicon[:50]
+    forms = list(sufi.iter_stacked_forms(words))
+    assert sufi.count_stacked_forms(words) == len(forms)
+    assert not any('larları' in f.form or 'lərləri' in f.form for f in forms)
+    assert [f.form for f in sufi.iter_stacked_forms(words, start=100, stop=130)] == [f.form for f in forms[100:130]]
+
+def test_pronominal_n_only_after_third_person(lexicon):
+    """Bitişdirici -n- yalnız 3s/3p mənsubiyyətindən sonra Yönlük/Yerlik/Çıxışlıq hallarına artırılır."""
+    oblique = tuple(sufi.PRONOMINAL_N_CASES)
+    for form in sufi.iter_stacked_forms(lexicon, possessive=tuple(sufi.PERSONS), case=oblique, xeberlik=(None,)):
+        base = sufi.iter_stacked_forms(form.word, plural=(form.plural,), possessive=(form.possessive,),
+                                       case=('Adlıq',), xeberlik=(None,))
+        if form.form == next(base).form:
+            continue  # saitsiz sözlər: şəkilçi artırılmır
+        case_suffix = form.suffixes[-1]
+        assert case_suffix.startswith('n') == (form.possessive in sufi.PRONOMINAL_N_PERSONS), form
+
+# ==================== BİR KEÇİDDƏ İŞ KİTABI ====================
+def workbook_snapshot(path):
+    """Hər sheet-in dəyərləri, sütun enləri, birləşmiş xanaları və başlıq üslubları (sheet sırası ilə)."""
+    wb = load_workbook(path)
+    snapshot = []
+    for ws in wb.worksheets:
+        headers = [
+            (cell.coordinate, cell.font.b, cell.fill.fgColor.rgb, cell.alignment.horizontal, cell.alignment.wrap_text)
+            for row in ws.iter_rows(max_row=2) for cell in row
+        ]
+        snapshot.append((
+            ws.title,
+            list(ws.iter_rows(values_only=True)),
+            {key: dim.width for key, dim in ws.column_dimensions.items()},
+            sorted(str(r) for r in ws.merged_cells.ranges),
+            headers,
+            {cell.alignment.wrap_text for row in ws.iter_rows(min_row=3) for cell in row}
+        ))
+    return snapshot
+
+def test_build_workbook_matches_sheet_chain(tmp_path, input_frame):
+    frame = input_frame.head(300)
+    frame.to_excel(tmp_path / 'in.xlsx', index=False)
+    chain = str(tmp_path / 'chain.xlsx')
+    sufi.process_words(str(tmp_path / 'in.xlsx'), chain)
+    sufi.extract_unique_suffixes_and_examples_with_code_suffixes(chain, chain)
+    sufi.create_isimler_sheet_with_grouped_headers(chain)
+    sufi.build_workbook(frame['Söz'], str(tmp_path / 'build.xlsx'), pos_labels=frame[sufi.POS_INPUT_COLUMN])
+    assert workbook_snapshot(tmp_path / 'build.xlsx') == workbook_snapshot(chain)
+
+# ==================== BÜTÜN_SÖZLƏR-İN HİSSƏLƏRƏ BÖLÜNMƏSİ ====================
+SHARD_WORDS = ['kitab', 'ev', 'su', 'alma', 'göz']  # rows_per_shard=50 -> hər hissədə 2 söz
+
+def all_words_sheets(path):
+    sheets = pd.read_excel(path, sheet_name=None, keep_default_na=False)
+    return {name: df['Yeni Söz'].tolist() for name, df in sheets.items() if name.startswith('Bütün_Sözlər')}
+
+def test_shards_match_across_pipelines(tmp_path):
+    pd.DataFrame({'Söz': SHARD_WORDS}).to_excel(tmp_path / 'in.xlsx', index=False)
+    manifests = {
+        'build': sufi.build_workbook(pd.Series(SHARD_WORDS), str(tmp_path / 'build.xlsx'), rows_per_shard=50),
+        'process': sufi.process_words(str(tmp_path / 'in.xlsx'), str(tmp_path / 'process.xlsx'), rows_per_shard=50),
+        'stream': sufi.stream_process_words(str(tmp_path / 'in.xlsx'), str(tmp_path / 'stream.xlsx'),
+                                            rows_per_shard=50)
+    }
+    manifest = manifests['build']
+    assert manifests['process'] == manifest and manifests['stream'] == manifest
+    assert [entry['sheet'] for entry in manifest] == ['Bütün_Sözlər', 'Bütün_Sözlər_2', 'Bütün_Sözlər_3']
+
+    for name in manifests:
+        sheets = all_words_sheets(tmp_path / f'{name}.xlsx')
+        assert list(sheets) == [entry['sheet'] for entry in manifest]
+        for entry in manifest:
+            # Hər sheet yalnız öz sözlərinin bütün formalarını saxlayır - heç bir söz iki sheet-ə bölünmür
+            words = SHARD_WORDS[entry['start']:entry['stop']]
+            assert (entry['first_word'], entry['last_word']) == (words[0], words[-1])
+            assert sheets[entry['sheet']] == [
+                sufi.format_record(record, {}) for word in words for record in sufi.paradigm_records(word)
+            ]
+
+def test_cli_shards_and_writes_manifest(tmp_path):
+    pd.DataFrame({'Söz': SHARD_WORDS}).to_excel(tmp_path / 'in.xlsx', index=False)
+    subprocess.run([sys.executable, os.path.abspath('sufi.py'), 'in.xlsx', 'out.xlsx', '--rows-per-shard', '50',
+                    '--manifest', 'manifest.json'], check=True, capture_output=True, cwd=tmp_path)
+    with open(tmp_path / 'manifest.json', encoding='utf-8') as f:
+        manifest = json.load(f)
+    assert manifest == sufi.build_shard_manifest(pd.Series(SHARD_WORDS), 50)
+    assert list(all_words_sheets(tmp_path / 'out.xlsx')) == [entry['sheet'] for entry in manifest]
+
+def test_delta_parts_follow_new_words_and_rules_version(tmp_path, monkeypatch):
+    out = str(tmp_path / 'delta')
+    sufi.build_delta_workbook(pd.Series(['Kitab', 'ev']), out)
+    manifest = sufi.build_delta_workbook(pd.Series(['ev', 'su', 'kitab', 'su']), out)
+    assert [(part['file'], part['words']) for part in manifest['parts']] == [('part_0001.xlsx', 2), ('part_0002.xlsx', 1)]
+    assert pd.read_excel(tmp_path / 'delta' / 'part_0002.xlsx', sheet_name='Cəm_Formaları')['Söz'].tolist() == ['su']
+    assert manifest['removed'] == []
+    assert sufi.build_delta_workbook(pd.Series(['su', 'kitab', 'ev']), out) == manifest
+
+    monkeypatch.setattr(sufi, 'rules_version', lambda suffix_examples=None: 'yeni')
+    manifest = sufi.build_delta_workbook(pd.Series(['ev', 'su']), out)
+    assert manifest == sufi.read_delta_manifest(out, 'yeni')
+    assert [(part['file'], part['words']) for part in manifest['parts']] == [('part_0003.xlsx', 2)]
+    assert sorted(p.name for p in (tmp_path / 'delta').iterdir()) == ['delta_manifest.json', 'part_0003.txt',
+                                                                       'part_0003.xlsx']
+
+def test_delta_keeps_parts_when_suffixes_file_is_unreadable(tmp_path, suffixes_file):
+    out = str(tmp_path / 'delta')
+    sufi.build_delta_workbook(pd.Series(['kitab', 'ev']), out, suffixes_file)
+    manifest = sufi.build_delta_workbook(pd.Series(['kitab', 'ev', 'su', 'alma']), out, suffixes_file)
+    os.rename(suffixes_file, tmp_path / 'moved.xlsx')
+    with pytest.raises(OSError):
+        sufi.build_delta_workbook(pd.Series(['kitab', 'ev', 'su', 'alma', 'göz']), out, suffixes_file)
+    assert sufi.read_delta_manifest(out, manifest['rules_version']) == manifest
+    assert all(os.path.exists(os.path.join(out, part['file'])) for part in manifest['parts'])
+
+def test_delta_removes_stale_parts_only_after_the_new_manifest(tmp_path, monkeypatch):
+    out = str(tmp_path / 'delta')
+    sufi.build_delta_workbook(pd.Series(['kitab', 'ev']), out)
+    monkeypatch.setattr(sufi, 'rules_version', lambda suffix_examples=None: 'yeni')
+
+    def fail(json_file, data):
+        raise OSError('disk dolub')
+    with monkeypatch.context() as m:
+        m.setattr(sufi, '_replace_json_file', fail)
+        with pytest.raises(OSError):
+            sufi.build_delta_workbook(pd.Series(['kitab', 'ev']), out)
+    assert (tmp_path / 'delta' / 'part_0001.xlsx').exists() and (tmp_path / 'delta' / 'part_0001.txt').exists()
+    manifest = sufi.build_delta_workbook(pd.Series(['kitab', 'ev']), out)
+    assert [part['file'] for part in manifest['parts']] == ['part_0002.xlsx']
+    assert not (tmp_path / 'delta' / 'part_0001.xlsx').exists()
+
+def test_delta_manifest_lists_words_gone_from_input(tmp_path):
+    out = str(tmp_path / 'delta')
+    sufi.build_delta_workbook(pd.Series(['kitab', 'ev']), out)
+    sufi.build_delta_workbook(pd.Series(['kitab', 'ev', 'su']), out)
+    manifest = sufi.build_delta_workbook(pd.Series(['su']), out)
+    assert len(manifest['parts']) == 2
+    assert manifest['removed'] == [{'word': 'kitab', 'file': 'part_0001.xlsx'}, {'word': 'ev', 'file': 'part_0001.xlsx'}]
+    assert sufi.read_delta_manifest(out, sufi.rules_version()) == manifest
+
+    # İsim -> Fel: söz paradiqmadan çıxır, amma hissəsi dəyişmir
+    manifest = sufi.build_delta_workbook(pd.Series(['kitab', 'ev', 'su']), out,
+                                         pos_labels=pd.Series(['İsim', 'Fel', 'İsim']))
+    assert manifest['removed'] == [{'word': 'ev', 'file': 'part_0001.xlsx'}]
+    manifest = sufi.build_delta_workbook(pd.Series(['kitab', 'ev', 'su']), out)
+    assert manifest['removed'] == [] and len(manifest['parts']) == 2
+    assert sufi.read_delta_manifest(out, sufi.rules_version()) == manifest
+
+def test_words_per_shard_needs_a_whole_paradigm():
+    assert sufi.words_per_shard(len(sufi.PARADIGM_SLOTS)) == 1
+    with pytest.raises(ValueError):
+        sufi.words_per_shard(len(sufi.PARADIGM_SLOTS) - 1)
+
+# ==================== ŞƏKİLÇİ NÜMUNƏLƏRİ SNAPSHOT-U ====================
+@pytest.fixture
+def suffixes_file(tmp_path):
+    path = tmp_path / 'suffixes.xlsx'
+    pd.DataFrame({'Şəkilçi': ['lar', 'da', 'yu'], 'Nümunə': ['kitablar', 'evdə', 'suyu']}).to_excel(
+        path, sheet_name='Şəkilçilər və Nümunələr', index=False)
+    return str(path)
+
+EXPECTED_EXAMPLES = {'lar': 'kitablar', 'da': 'evdə', 'yu': 'suyu'}
+
+@pytest.mark.parametrize('damage', ['truncate', 'null', 'list', 'missing_keys'])
+def test_damaged_snapshot_is_rebuilt(suffixes_file, tmp_path, damage):
+    snapshot = tmp_path / 'suffixes_şəkilçilər.json'
+    assert sufi.read_suffix_examples_from_excel(suffixes_file) == EXPECTED_EXAMPLES
+    text = snapshot.read_text(encoding='utf-8')
+    snapshot.write_text({
+        'truncate': text[:len(text) // 2], 'null': 'null', 'list': '[1, 2]',
+        'missing_keys': f'{{"version": {sufi.SUFFIX_SNAPSHOT_VERSION}}}'
+    }[damage], encoding='utf-8')
+
+    for _ in range(2):
+        assert sufi.read_suffix_examples_from_excel(suffixes_file) == EXPECTED_EXAMPLES
+    assert sufi._read_suffix_snapshot(str(snapshot))['examples'] == EXPECTED_EXAMPLES
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['suffixes.xlsx', 'suffixes_şəkilçilər.json']
+
+# ==================== NİTQ HİSSƏLƏRİ ÜZRƏ YÖNLƏNDİRMƏ ====================
+@pytest.fixture(scope='module')
+def input_frame():
+    return pd.read_excel('input.xlsx')
+
+def test_routing_by_input_labels_keeps_labelled_nouns(input_frame):
+    words, sheets = sufi._prepare_words(input_frame['Söz'], True, None, input_frame[sufi.POS_INPUT_COLUMN])
+    labels = sufi.normalize_pos_labels(input_frame[sufi.POS_INPUT_COLUMN])
+    lemmas = sufi.normalize_words(input_frame['Söz'])
+    assert set(lemmas[labels.isin(sufi.PARADIGM_POS)]) <= set(words)
+    assert not set(lemmas[labels.isin({'Fel', 'Zərf'})]) & set(words)
+    assert {'qala', 'məqalə', 'mərhələ', 'şəlalə', 'qaymaq', 'mərcimək'} <= set(words)
+    assert len(sheets[sufi.POS_SHEET]) == lemmas.nunique()
+
+def test_default_routing_without_labels_keeps_every_word(input_frame):
+    words, sheets = sufi._prepare_words(input_frame['Söz'], True, None)
+    assert len(words) == sufi.normalize_words(input_frame['Söz']).nunique()
+    assert sufi.POS_SHEET not in sheets
+
+def test_guessing_pos_is_opt_in():
+    words, sheets = sufi._prepare_words(pd.Series(['qala', 'oxumaq', 'kitab']), True, True)
+    assert words.tolist() == ['kitab']
+    assert sheets[sufi.POS_SHEET][sufi.POS_SHEET_COLUMNS[1]].tolist() == ['Zərf', 'Fel', 'İsim']
+    words, _ = sufi._prepare_words(pd.Series(['qala', 'oxumaq', 'kitab']), True, True,
+                                   pd.Series(['isim ', None, 'İsim']))
+    assert words.tolist() == ['qala', 'kitab']
+
+def test_pos_label_spellings():
+    labels = sufi.normalize_pos_labels(pd.Series(['İsim', 'isim', ' zərf', 'feil ', 'SİFƏT', 'bağlayıcı', 'si', None]))
+    assert labels.tolist()[:6] == ['İsim', 'İsim', 'Zərf', 'Fel', 'Sifət', 'Qoşma']
+    assert labels.iloc[6:].isna().all()
+
+def test_stream_routing_matches_batch(tmp_path):
+    frame = pd.DataFrame({'Söz': ['Qala', 'oxumaq', 'qala', 'gözəl', None, 'tez'],
+                          'Nitq hissəsi': ['İsim', 'feil', 'Zərf', 'sifət', 'İsim', None]})
+    frame.to_excel(tmp_path / 'in.xlsx', index=False)
+    sufi.stream_process_words(str(tmp_path / 'in.xlsx'), str(tmp_path / 'stream.xlsx'))
+    sufi.process_words(str(tmp_path / 'in.xlsx'), str(tmp_path / 'batch.xlsx'))
+    stream = pd.read_excel(tmp_path / 'stream.xlsx', sheet_name=None)
+    batch = pd.read_excel(tmp_path / 'batch.xlsx', sheet_name=None)
+    assert stream[sufi.POS_SHEET].equals(batch[sufi.POS_SHEET])
+    assert batch[sufi.POS_SHEET]['Nitq hissəsi'].tolist() == ['İsim', 'Fel', 'Sifət', 'İsim']
+    assert batch['Cəm_Formaları']['Söz'].tolist() == stream['Cəm_Formaları']['Söz'].tolist() == ['qala', 'gözəl', 'tez']
+
+def test_cli_stream_matches_stream_process_words(tmp_path):
+    frame = pd.DataFrame({'Söz': ['Qala', 'oxumaq', 'qala', 'gözəl'], 'Nitq hissəsi': ['İsim', 'feil', 'Zərf', 'sifət']})
+    frame.to_excel(tmp_path / 'in.xlsx', index=False)
+    subprocess.run([sys.executable, os.path.abspath('sufi.py'), 'in.xlsx', 'cli.xlsx', '--stream', '--row-map',
+                    '--no-dedupe'], check=True, capture_output=True, cwd=tmp_path)
+    sufi.stream_process_words(str(tmp_path / 'in.xlsx'), str(tmp_path / 'api.xlsx'), row_map=True, dedupe=False)
+    cli = pd.read_excel(tmp_path / 'cli.xlsx', sheet_name=None)
+    api = pd.read_excel(tmp_path / 'api.xlsx', sheet_name=None)
+    assert list(cli) == list(api) and all(cli[sheet].equals(api[sheet]) for sheet in api)
+    assert sufi.ROW_MAP_SHEET in cli and cli['Cəm_Formaları']['Söz'].tolist() == ['qala', 'gözəl']
+
+def test_raw_input_keeps_blank_cells_as_nan(tmp_path):
+    pd.DataFrame({'Söz': ['kitab', None, 'ev']}).to_excel(tmp_path / 'in.xlsx', index=False)
+    words = pd.read_excel(tmp_path / 'in.xlsx')['Söz']
+    sufi.build_workbook(words, str(tmp_path / 'build.xlsx'), normalize=False)
+    sufi.stream_process_words(str(tmp_path / 'in.xlsx'), str(tmp_path / 'stream.xlsx'), normalize=False)
+    sufi.export_csv(words, str(tmp_path / 'out.csv'), normalize=False)
+    for name in ('build', 'stream'):
+        sheet = pd.read_excel(tmp_path / f'{name}.xlsx', sheet_name='Cəm_Formaları', keep_default_na=False)
+        assert sheet['Söz'].tolist() == ['kitab', 'nan', 'ev'], name
+    assert pd.read_csv(tmp_path / 'out.csv', keep_default_na=False)['Söz'].drop_duplicates().tolist() == \
+        ['kitab', 'nan', 'ev']
+
+def test_stream_without_dedupe_keeps_repeated_lemmas(tmp_path):
+    pd.DataFrame({'Söz': ['Kitab', 'ev', ' kitab', None, 'ev']}).to_excel(tmp_path / 'in.xlsx', index=False)
+    manifest = sufi.stream_process_words(str(tmp_path / 'in.xlsx'), str(tmp_path / 'out.xlsx'), dedupe=False)
+    assert manifest[0]['stop'] == 4
+    assert pd.read_excel(tmp_path / 'out.xlsx', sheet_name='Cəm_Formaları')['Söz'].tolist() == \
+        ['kitab', 'ev', 'kitab', 'ev']
+
+# ==================== ÇIXIŞ FORMATLARI ====================
+def read_exported_words(path, fmt):
+    if fmt == 'csv':
+        return pd.read_csv(path)['Söz'].drop_duplicates().tolist()
+    if fmt == 'jsonl':
+        return pd.read_json(path, lines=True)['Söz'].tolist()
+    if fmt == 'parquet':
+        return pd.read_parquet(path)['Söz'].tolist()
+    return pd.read_feather(path)['Söz'].tolist()
+
+@pytest.mark.parametrize('fmt', ['csv', 'jsonl', 'parquet', 'feather'])
+def test_export_backends_normalize_input(tmp_path, fmt):
+    if fmt in ('parquet', 'feather'):
+        pytest.importorskip('pyarrow')
+    path = str(tmp_path / f'out.{fmt}')
+    sufi.export_paradigms(pd.Series([' Kitab', 'kitab', None, float('nan'), 'İlan', 'ev']), path)
+    assert read_exported_words(path, fmt) == ['kitab', 'ilan', 'ev']
+
+@pytest.mark.parametrize('fmt', ['csv', 'jsonl', 'parquet'])
+def test_export_backends_take_suffix_examples(tmp_path, suffixes_file, fmt):
+    if fmt == 'parquet':
+        pytest.importorskip('pyarrow')
+    path = str(tmp_path / f'out.{fmt}')
+    sufi.export_paradigms(pd.Series(['kitab']), path, suffixes_file=suffixes_file)
+    if fmt == 'jsonl':
+        forms = pd.DataFrame(pd.read_json(path, lines=True)['formalar'][0])
+    elif fmt == 'csv':
+        forms = pd.read_csv(path, keep_default_na=False)
+    else:
+        forms = pd.read_parquet(str(tmp_path / 'out_formalar.parquet'))
+    examples = forms.set_index('Forma')['Nümunə'].fillna('')
+    assert examples['kitablar'] == 'kitablar' and examples['kitabda'] == 'evdə' and examples['kitab'] == ''
+
+def test_cli_picks_backend_from_extension(tmp_path):
+    pd.DataFrame({'Söz': ['Kitab', 'ev']}).to_excel(tmp_path / 'in.xlsx', index=False)
+    subprocess.run([sys.executable, os.path.abspath('sufi.py'), str(tmp_path / 'in.xlsx'), str(tmp_path / 'out.csv')],
+                   check=True, capture_output=True, cwd=tmp_path)
+    assert read_exported_words(tmp_path / 'out.csv', 'csv') == ['kitab', 'ev']
+
+# ==================== YERLİ SERVİS ====================
+def call_service(*requests, route_pos=False, metrics=None):
+    """Servisin marşrutlayıcısını batch döngüsü ilə birlikdə işə salır və (status, cavab) siyahısı qaytarır."""
+    async def run():
+        service = {
+            'queue': asyncio.Queue(), 'metrics': metrics or sufi.new_service_metrics(), 'suffix_examples': {},
+            'route_pos': route_pos, 'max_batch_words': 2048, 'max_wait': 0.001
+        }
+        batcher = asyncio.create_task(sufi._batch_loop(service))
+        try:
+            return await asyncio.gather(*(sufi._route_request(service, 'POST', '/paradigm', body) for body in requests))
+        finally:
+            batcher.cancel()
+    return asyncio.run(run())
+
+@pytest.mark.parametrize('body', [b'[1, 2]', b'null', b'"kitab"', b'{"words": "kitab"}', b'{bad'])
+def test_service_rejects_malformed_payloads(body):
+    [(status, response)] = call_service(body)
+    assert status == 400 and 'error' in response
+
+def test_service_engine_failure_returns_500(monkeypatch):
+    def fail(words, suffix_examples=None, route_pos=False):
+        raise KeyError('slot')
+    monkeypatch.setattr(sufi, 'service_documents', fail)
+    metrics = sufi.new_service_metrics()
+    [(status, response)] = call_service(b'{"words": ["kitab"]}', metrics=metrics)
+    assert status == 500 and 'slot' in response['error']
+    assert metrics['errors'] == 1
+
+def test_service_batches_match_paradigm_documents():
+    responses = call_service(b'{"words": ["Kitab", "su"]}', b'{"word": "ev"}', b'{"words": ["kitab", ""]}')
+    assert [status for status, _ in responses] == [200, 200, 200]
+    for (_, response), words in zip(responses, (['kitab', 'su'], ['ev'], ['kitab'])):
+        assert response['paradigms'] == [sufi.paradigm_document(word) for word in words]
+
+def test_service_tags_pos_only_when_routing():
+    [(_, plain)] = call_service(b'{"words": ["qala", "kitab"]}')
+    assert plain['paradigms'] == [sufi.paradigm_document('qala'), sufi.paradigm_document('kitab')]
+    [(_, routed)] = call_service(b'{"words": ["qala", "kitab"]}', route_pos=True)
+    assert [(d['Nitq hissəsi'], bool(d['formalar'])) for d in routed['paradigms']] == [('Zərf', False), ('İsim', True)]